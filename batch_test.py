@@ -3,13 +3,19 @@
 
 import asyncio
 import os
+import time
 from datetime import datetime
+
+import httpx
 from dotenv import load_dotenv
 
 # 加载环境变量
-load_dotenv()
+if not os.environ.get('_MARKET_AGENT_ENV_LOADED'):
+    load_dotenv()
+    os.environ['_MARKET_AGENT_ENV_LOADED'] = '1'
 
 from workflow.backend.graph import Graph
+from workflow.backend.utils import AsyncArtifactWriter, AsyncRateLimiter
 
 # 3个快速测试话题
 TOPICS = [
@@ -18,33 +24,46 @@ TOPICS = [
     {'topic': 'WHO宣布新冠疫情彻底结束', 'category': '公共卫生', 'date': '2025-12-31'},
 ]
 
+# 并发话题数上限，避免 API 限流
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+
+# 话题启动速率上限（每分钟），所有话题共享同一个令牌桶
+LIMITER = AsyncRateLimiter(max_rate=int(os.getenv('BATCH_RPM', '60')), time_period=60)
+
+def _write_text(path, data):
+    """同步写入文本文件（通过 asyncio.to_thread 调用，避免阻塞事件循环）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(data)
 
-async def run_single_topic(topic_info, index):
+
+async def run_single_topic(topic_info, index, writer, http):
     """运行单个话题分析"""
     try:
-        print(f'\n[{index+1}/15] 🔄 分析中: {topic_info["topic"]}')
+        print(f'\n[{index+1}/{len(TOPICS)}] 🔄 分析中: {topic_info["topic"]}')
         
         g = Graph(
             topic=topic_info['topic'],
             event_category=topic_info['category'],
             target_date=topic_info['date'],
-            job_id=f'batch-{index+1}'
+            job_id=f'batch-{index+1}',
+            http_client=http
         )
         
         thread = {'configurable': {'thread_id': f'batch-thread-{index+1}'}}
         final_report = None
         
+        # 只在发起工作流前取令牌，状态循环本身不占用限流器
+        await LIMITER.acquire()
         async for state in g.run(thread):
             if 'editor' in state and state['editor'].get('report'):
                 final_report = state['editor']['report']
+                break
         
         if final_report:
             # 保存到单独文件
             safe_name = topic_info['topic'].replace('/', '_').replace(' ', '_')[:30]
             filename = f'reports/report_{index+1:02d}_{safe_name}.md'
-            os.makedirs('reports', exist_ok=True)
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(final_report)
+            await writer.submit(filename, final_report.encode('utf-8'))
             print(f'    ✅ 完成: {len(final_report)} 字符')
             return {'topic': topic_info['topic'], 'status': 'success', 'length': len(final_report), 'file': filename}
         else:
@@ -58,19 +77,39 @@ async def run_single_topic(topic_info, index):
 async def batch_test():
     print('='*60)
     print('🚀 事件期货可行性报告批量测试')
-    print(f'📊 共 {len(TOPICS)} 个话题')
+    print(f'📊 共 {len(TOPICS)} 个话题 (并发数: {BATCH_CONCURRENCY})')
     print('='*60)
     
+    os.makedirs('reports', exist_ok=True)
     start_time = datetime.now()
-    results = []
+    start = time.monotonic()
     
-    # 顺序执行，避免 API 限流
-    for i, topic in enumerate(TOPICS):
-        result = await run_single_topic(topic, i)
-        results.append(result)
+    # 有界并发执行，由信号量控制同时运行的话题数
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
     
-    end_time = datetime.now()
-    duration = (end_time - start_time).total_seconds()
+    writer = AsyncArtifactWriter()
+    
+    # 所有话题共享的 HTTP 连接池，避免每个话题重新握手；读超时与 OpenAI SDK 默认一致
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=64),
+        timeout=httpx.Timeout(600, connect=5)
+    ) as http:
+        async def run_bounded(topic_info, index):
+            async with sem:
+                return await run_single_topic(topic_info, index, writer, http)
+        
+        tasks = [run_bounded(t, i) for i, t in enumerate(TOPICS)]
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await writer.close()
+    results = [
+        r if not isinstance(r, BaseException)
+        else {'topic': t['topic'], 'status': 'error', 'error': str(r)}
+        for t, r in zip(TOPICS, results)
+    ]
+    
+    duration = time.monotonic() - start
     
     # 统计结果
     success = sum(1 for r in results if r['status'] == 'success')
@@ -85,7 +124,7 @@ async def batch_test():
     print(f'⏱️ 平均每个: {duration/len(TOPICS):.1f} 秒')
     
     # 生成汇总报告
-    summary = f'''# 事件期货可行性报告批量测试汇总
+    header = f'''# 事件期货可行性报告批量测试汇总
 
 ## 测试概况
 - **测试时间**: {start_time.strftime('%Y-%m-%d %H:%M:%S')}
@@ -99,17 +138,22 @@ async def batch_test():
 | # | 话题 | 类别 | 状态 | 报告长度 |
 |---|------|------|------|----------|
 '''
+    parts = [header]
     for i, (topic, result) in enumerate(zip(TOPICS, results)):
         status = '✅' if result['status'] == 'success' else '❌'
         length = result.get('length', '-')
-        summary += f"| {i+1} | {topic['topic'][:25]}... | {topic['category']} | {status} | {length} |\n"
+        parts.append(f"| {i+1} | {topic['topic'][:25]}... | {topic['category']} | {status} | {length} |\n")
+    summary = ''.join(parts)
     
-    os.makedirs('reports', exist_ok=True)
-    with open('reports/batch_summary.md', 'w', encoding='utf-8') as f:
-        f.write(summary)
+    await asyncio.to_thread(_write_text, 'reports/batch_summary.md', summary)
     
     print(f'\n📄 汇总报告已保存到 reports/batch_summary.md')
 
 
 if __name__ == '__main__':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(batch_test())
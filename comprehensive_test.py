@@ -4,17 +4,21 @@
 """
 
 import asyncio
-import json
 import os
 import re
 import time
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+import orjson
 from dotenv import load_dotenv
 
-load_dotenv()
+if not os.environ.get('_MARKET_AGENT_ENV_LOADED'):
+    load_dotenv()
+    os.environ['_MARKET_AGENT_ENV_LOADED'] = '1'
 
 from workflow.backend.graph import Graph
+from workflow.backend.utils import AsyncArtifactWriter, aclose_shared_http_client
 
 # 15个多样化话题，覆盖不同类别
 TEST_TOPICS = [
@@ -53,9 +57,55 @@ TEST_TOPICS = [
 ]
 
 
+# 并发测试话题数上限，避免 API 限流
+TEST_CONCURRENCY = int(os.getenv('TEST_CONCURRENCY', '4'))
+
+
+# 预编译正则，避免每份报告重复解析
+_NON_CJK = re.compile(r'[^\u4e00-\u9fff]+')
+
+_SCORE_PATTERNS = {
+    key: re.compile(pattern, re.IGNORECASE)
+    for key, pattern in {
+        'quantifiability': r'可量化性[^0-9]*?(\d+)/10|维度评分[：:]\s*(\d+)/10.*?可量化',
+        'oracle': r'预言机[^0-9]*?(\d+)/10|结算机制评分[：:]\s*(\d+)/10',
+        'market_demand': r'市场需求[^0-9]*?(\d+)/10|需求评分[：:]\s*(\d+)/10',
+        'compliance_risk': r'合规[^0-9]*?(\d+)/10|风险评分[：:]\s*(\d+)/10',
+        'overall': r'总评分[：:]\s*(\d+\.?\d*)/10|综合[得评]分[：:]\s*(\d+\.?\d*)/10'
+    }.items()
+}
+
+# 报告结构检查：章节名 -> "##" 标题行中需出现的关键词
+_SECTION_KEYWORDS = {
+    '事件概述': '事件概述',
+    '可量化性评估': '可量化性',
+    '预言机与结算': '预言机',
+    '市场需求分析': '市场需求',
+    '合规与风险': '合规',
+    '综合结论': '结论',
+}
+# 一次扫描取出每行首个 "##" 之后的文本，等价于逐章节搜索 r'##.*关键词'
+_HEADING_RE = re.compile(r'##[^\n]*')
+
+# 关键词 -> 推荐决策
+_REC_LABELS = {
+    '暂不推荐': '不推荐上线',
+    '不推荐': '不推荐上线',
+    '谨慎上线': '谨慎上线',
+    '推荐上线': '推荐上线',
+}
+# 同时出现多个决策时取最谨慎的一个
+_REC_PRIORITY = ('不推荐上线', '谨慎上线', '推荐上线')
+# 单次扫描匹配全部关键词；长词优先，使"不推荐上线"不会再被误判为"推荐上线"
+_REC_RE = re.compile('|'.join(
+    re.escape(keyword) for keyword in sorted(_REC_LABELS, key=len, reverse=True)
+))
+
+
 def estimate_tokens(text: str) -> int:
     """粗略估算 token 数量（中文约 1.5 字符/token，英文约 4 字符/token）"""
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
+    # 一次 C 层扫描删去非中文字符，剩余长度即中文字符数，无需构造匹配列表
+    chinese_chars = len(_NON_CJK.sub('', text))
     other_chars = len(text) - chinese_chars
     return int(chinese_chars / 1.5 + other_chars / 4)
 
@@ -71,17 +121,8 @@ def extract_scores(report: str) -> Dict[str, Any]:
         'recommendation': None
     }
     
-    # 匹配评分模式
-    patterns = {
-        'quantifiability': r'可量化性[^0-9]*?(\d+)/10|维度评分[：:]\s*(\d+)/10.*?可量化',
-        'oracle': r'预言机[^0-9]*?(\d+)/10|结算机制评分[：:]\s*(\d+)/10',
-        'market_demand': r'市场需求[^0-9]*?(\d+)/10|需求评分[：:]\s*(\d+)/10',
-        'compliance_risk': r'合规[^0-9]*?(\d+)/10|风险评分[：:]\s*(\d+)/10',
-        'overall': r'总评分[：:]\s*(\d+\.?\d*)/10|综合[得评]分[：:]\s*(\d+\.?\d*)/10'
-    }
-    
-    for key, pattern in patterns.items():
-        match = re.search(pattern, report, re.IGNORECASE)
+    for key, pattern in _SCORE_PATTERNS.items():
+        match = pattern.search(report)
         if match:
             for g in match.groups():
                 if g:
@@ -89,30 +130,26 @@ def extract_scores(report: str) -> Dict[str, Any]:
                     break
     
     # 提取推荐决策
-    if '推荐上线' in report:
-        scores['recommendation'] = '推荐上线'
-    elif '谨慎上线' in report:
-        scores['recommendation'] = '谨慎上线'
-    elif '不推荐' in report or '暂不推荐' in report:
-        scores['recommendation'] = '不推荐上线'
+    found = {_REC_LABELS[m.group()] for m in _REC_RE.finditer(report)}
+    if found:
+        scores['recommendation'] = next(label for label in _REC_PRIORITY if label in found)
     
     return scores
 
 
-def check_report_structure(report: str) -> Dict[str, bool]:
-    """检查报告结构完整性"""
-    required_sections = {
-        '事件概述': bool(re.search(r'##.*事件概述|## 事件概述', report)),
-        '可量化性评估': bool(re.search(r'##.*可量化性|## 可量化性评估', report)),
-        '预言机与结算': bool(re.search(r'##.*预言机|## 预言机', report)),
-        '市场需求分析': bool(re.search(r'##.*市场需求|## 市场需求', report)),
-        '合规与风险': bool(re.search(r'##.*合规|## 合规', report)),
-        '综合结论': bool(re.search(r'##.*综合结论|## 综合结论|##.*结论', report)),
-    }
-    return required_sections
+def check_report_structure(report: str) -> Tuple[Dict[str, bool], bool]:
+    """检查报告结构完整性，返回 (各章节是否存在, 是否全部存在)"""
+    found = set()
+    for match in _HEADING_RE.finditer(report):
+        heading = match.group()
+        found.update(name for name, keyword in _SECTION_KEYWORDS.items() if keyword in heading)
+        if len(found) == len(_SECTION_KEYWORDS):
+            break
+    sections = {name: name in found for name in _SECTION_KEYWORDS}
+    return sections, len(found) == len(_SECTION_KEYWORDS)
 
 
-async def run_single_test(topic_info: Dict, index: int) -> Dict[str, Any]:
+async def run_single_test(topic_info: Dict, index: int, writer: AsyncArtifactWriter) -> Dict[str, Any]:
     """运行单个话题测试"""
     result = {
         'index': index + 1,
@@ -128,7 +165,7 @@ async def run_single_test(topic_info: Dict, index: int) -> Dict[str, Any]:
         'error': None
     }
     
-    start_time = time.time()
+    start_time = time.monotonic()
     
     try:
         print(f"\n[{index+1}/{len(TEST_TOPICS)}] 🔄 测试中: {topic_info['topic']}")
@@ -146,8 +183,9 @@ async def run_single_test(topic_info: Dict, index: int) -> Dict[str, Any]:
         async for state in g.run(thread):
             if 'editor' in state and state['editor'].get('report'):
                 final_report = state['editor']['report']
+                break
         
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         result['time_seconds'] = round(elapsed, 1)
         
         if final_report:
@@ -155,49 +193,70 @@ async def run_single_test(topic_info: Dict, index: int) -> Dict[str, Any]:
             result['report_length'] = len(final_report)
             result['estimated_tokens'] = estimate_tokens(final_report)
             result['scores'] = extract_scores(final_report)
-            result['structure'] = check_report_structure(final_report)
-            result['structure_complete'] = all(result['structure'].values())
+            result['structure'], result['structure_complete'] = check_report_structure(final_report)
             
             # 保存报告
             safe_name = topic_info['topic'].replace('/', '_').replace(' ', '_')[:30]
             filename = f'reports/comprehensive_{index+1:02d}_{safe_name}.md'
-            os.makedirs('reports', exist_ok=True)
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(final_report)
-            
-            print(f"    ✅ 成功 | {elapsed:.1f}s | {result['report_length']}字 | ~{result['estimated_tokens']}tokens")
-            print(f"       评分: 量化{result['scores'].get('quantifiability', '?')}/预言机{result['scores'].get('oracle', '?')}/需求{result['scores'].get('market_demand', '?')}/合规{result['scores'].get('compliance_risk', '?')}")
+            await writer.submit(filename, final_report.encode('utf-8'))
         else:
             result['status'] = 'failed'
             result['error'] = 'No report generated'
-            print(f"    ❌ 失败: 无报告生成")
             
     except Exception as e:
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         result['status'] = 'error'
         result['time_seconds'] = round(elapsed, 1)
         result['error'] = str(e)[:200]
-        print(f"    ❌ 错误: {str(e)[:100]}")
     
     return result
 
 
+def print_test_result(result: Dict[str, Any]) -> None:
+    """单个话题完成后立即输出结果"""
+    print(f"\n[{result['index']}/{len(TEST_TOPICS)}] 完成: {result['topic']}")
+    if result['status'] == 'success':
+        print(f"    ✅ 成功 | {result['time_seconds']}s | {result['report_length']}字 | ~{result['estimated_tokens']}tokens")
+        print(f"       评分: 量化{result['scores'].get('quantifiability', '?')}/预言机{result['scores'].get('oracle', '?')}/需求{result['scores'].get('market_demand', '?')}/合规{result['scores'].get('compliance_risk', '?')}")
+    elif result['status'] == 'failed':
+        print(f"    ❌ 失败: 无报告生成")
+    else:
+        print(f"    ❌ 错误: {result['error'][:100]}")
+
+
 async def main():
     print("=" * 70)
     print("🧪 事件期货可行性报告 - 综合测试")
     print(f"📅 测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"📊 测试话题数: {len(TEST_TOPICS)}")
+    print(f"📊 测试话题数: {len(TEST_TOPICS)} (并发数: {TEST_CONCURRENCY})")
     print("=" * 70)
     
+    os.makedirs('reports', exist_ok=True)
     all_results = []
-    total_start = time.time()
+    total_start = time.monotonic()
+    writer = AsyncArtifactWriter()
     
-    # 顺序执行测试
-    for i, topic in enumerate(TEST_TOPICS):
-        result = await run_single_test(topic, i)
-        all_results.append(result)
+    sem = asyncio.Semaphore(TEST_CONCURRENCY)
     
-    total_time = time.time() - total_start
+    async def run_bounded(topic_info, index):
+        async with sem:
+            return await run_single_test(topic_info, index, writer)
+    
+    # 有界并发执行测试，完成一个输出一个；报告文件由后台写入
+    tasks = [asyncio.create_task(run_bounded(t, i)) for i, t in enumerate(TEST_TOPICS)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            print_test_result(result)
+            all_results.append(result)
+    finally:
+        # 失败时也确保已完成话题的报告落盘；写入器保留到结果 JSON 写完再关闭
+        await writer.flush()
+        # 所有话题已结束，关闭各节点共享的 HTTP 连接池
+        await aclose_shared_http_client()
+    all_results.sort(key=lambda r: r['index'])
+    
+    total_time = time.monotonic() - total_start
     
     # 汇总统计
     print("\n" + "=" * 70)
@@ -207,6 +266,18 @@ async def main():
     success_results = [r for r in all_results if r['status'] == 'success']
     failed_results = [r for r in all_results if r['status'] != 'success']
     
+    # 每个数值列只遍历一次结果，后续统计复用同一列表
+    lengths = [r['report_length'] for r in success_results]
+    tokens = [r['estimated_tokens'] for r in success_results]
+    total_tokens = sum(tokens)
+    score_fields = ['quantifiability', 'oracle', 'market_demand', 'compliance_risk', 'overall']
+    score_columns = {field: [] for field in score_fields}
+    for r in success_results:
+        for field, column in score_columns.items():
+            value = r['scores'].get(field)
+            if value is not None:
+                column.append(value)
+    
     # 1. 基础统计
     print(f"\n### 1. 基础统计")
     print(f"   成功率: {len(success_results)}/{len(all_results)} ({100*len(success_results)/len(all_results):.1f}%)")
@@ -214,23 +285,22 @@ async def main():
     print(f"   平均耗时: {total_time/len(all_results):.1f}秒/话题")
     
     if success_results:
-        avg_length = sum(r['report_length'] for r in success_results) / len(success_results)
-        avg_tokens = sum(r['estimated_tokens'] for r in success_results) / len(success_results)
+        avg_length = sum(lengths) / len(lengths)
+        avg_tokens = total_tokens / len(tokens)
         print(f"   平均报告长度: {avg_length:.0f}字符")
         print(f"   平均Token消耗: ~{avg_tokens:.0f} tokens/报告")
     
     # 2. Token消耗分析
     print(f"\n### 2. Token消耗分析")
     if success_results:
-        tokens = [r['estimated_tokens'] for r in success_results]
         print(f"   最小: ~{min(tokens)} tokens")
         print(f"   最大: ~{max(tokens)} tokens")
-        print(f"   平均: ~{sum(tokens)/len(tokens):.0f} tokens")
-        print(f"   总计: ~{sum(tokens)} tokens (仅输出)")
+        print(f"   平均: ~{total_tokens/len(tokens):.0f} tokens")
+        print(f"   总计: ~{total_tokens} tokens (仅输出)")
         # 估算输入token（假设输入是输出的2倍）
-        estimated_input = sum(tokens) * 2
+        estimated_input = total_tokens * 2
         print(f"   估算输入: ~{estimated_input} tokens")
-        print(f"   估算总消耗: ~{sum(tokens) + estimated_input} tokens")
+        print(f"   估算总消耗: ~{total_tokens + estimated_input} tokens")
     
     # 3. 生成稳定性分析
     print(f"\n### 3. 生成稳定性分析")
@@ -256,13 +326,11 @@ async def main():
     
     # 4. 评分分布
     print(f"\n### 4. 评分分布")
-    score_fields = ['quantifiability', 'oracle', 'market_demand', 'compliance_risk', 'overall']
-    for field in score_fields:
-        scores = [r['scores'].get(field) for r in success_results if r['scores'].get(field) is not None]
+    field_cn = {'quantifiability': '可量化性', 'oracle': '预言机', 'market_demand': '市场需求', 
+               'compliance_risk': '合规风险', 'overall': '综合评分'}
+    for field, scores in score_columns.items():
         if scores:
             avg = sum(scores) / len(scores)
-            field_cn = {'quantifiability': '可量化性', 'oracle': '预言机', 'market_demand': '市场需求', 
-                       'compliance_risk': '合规风险', 'overall': '综合评分'}
             print(f"   {field_cn.get(field, field)}: 平均{avg:.1f}/10 (范围{min(scores)}-{max(scores)}, n={len(scores)})")
     
     # 5. 推荐分布
@@ -308,21 +376,26 @@ async def main():
         overall = r['scores'].get('overall', '-') if r['status'] == 'success' else '-'
         print(f"{r['index']:<3} {r['topic'][:24]:<25} {r['category'][:11]:<12} {status:<6} {r['time_seconds']:<8} {r['report_length']:<8} {r['estimated_tokens']:<8} {overall}")
     
-    # 保存JSON结果
-    with open('reports/comprehensive_test_results.json', 'w', encoding='utf-8') as f:
-        json.dump({
-            'test_time': datetime.now().isoformat(),
-            'total_topics': len(TEST_TOPICS),
-            'success_count': len(success_results),
-            'total_time_seconds': round(total_time, 1),
-            'avg_time_per_topic': round(total_time / len(all_results), 1),
-            'avg_tokens': round(sum(r['estimated_tokens'] for r in success_results) / max(1, len(success_results))),
-            'results': all_results
-        }, f, ensure_ascii=False, indent=2)
+    # 保存JSON结果 (与报告文件相同，经后台写入器在工作线程中写盘)
+    await writer.submit('reports/comprehensive_test_results.json', orjson.dumps({
+        'test_time': datetime.now().isoformat(),
+        'total_topics': len(TEST_TOPICS),
+        'success_count': len(success_results),
+        'total_time_seconds': round(total_time, 1),
+        'avg_time_per_topic': round(total_time / len(all_results), 1),
+        'avg_tokens': round(total_tokens / max(1, len(success_results))),
+        'results': all_results
+    }, option=orjson.OPT_INDENT_2))
+    await writer.close()
     
     print(f"\n📄 详细结果已保存到 reports/comprehensive_test_results.json")
     print("=" * 70)
 
 
 if __name__ == '__main__':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -2,11 +2,11 @@
 SearchResult - 搜索结果的结构化对象
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field, fields
+from typing import Optional, List, Dict, Any, ClassVar, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """
     事件期货可行性分析的结构化结果
@@ -58,6 +58,15 @@ class SearchResult:
     error: Optional[str] = None
     error_details: Optional[Dict[str, Any]] = None
     
+    # from_state 直接从工作流状态拷贝的字段
+    _OPTIONAL_STATE_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "feasibility_score", "event_category", "target_date",
+    )
+    _BRIEFING_STATE_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "quantifiability_briefing", "oracle_briefing",
+        "market_demand_briefing", "compliance_risk_briefing",
+    )
+    
     def __repr__(self) -> str:
         if self.success:
             return (
@@ -74,23 +83,7 @@ class SearchResult:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
-        return {
-            "success": self.success,
-            "topic": self.topic,
-            "report": self.report,
-            "feasibility_score": self.feasibility_score,
-            "event_category": self.event_category,
-            "target_date": self.target_date,
-            "job_id": self.job_id,
-            "quantifiability_briefing": self.quantifiability_briefing,
-            "oracle_briefing": self.oracle_briefing,
-            "market_demand_briefing": self.market_demand_briefing,
-            "compliance_risk_briefing": self.compliance_risk_briefing,
-            "references": self.references,
-            "elapsed_time": self.elapsed_time,
-            "error": self.error,
-            "error_details": self.error_details,
-        }
+        return {name: getattr(self, name) for name in _FIELD_NAMES}
     
     @classmethod
     def from_error(
@@ -112,35 +105,14 @@ class SearchResult:
     @classmethod
     def from_state(cls, state: Dict[str, Any], job_id: str, elapsed_time: float, topic: str = "") -> "SearchResult":
         """从工作流状态创建结果"""
-        # 提取报告 - 需要从嵌套的 editor 字典中提取
-        report = ""
+        # state 可能是 {"editor": {"report": "..."}} 格式，否则直接从 state 提取
+        src = state["editor"] if isinstance(state.get("editor"), dict) else state
         
-        # state 可能是 {"editor": {"report": "..."}} 格式
-        if "editor" in state and isinstance(state["editor"], dict):
-            report = state["editor"].get("report", "")
-            # 从 editor 状态中提取其他字段
-            editor_state = state["editor"]
-            inner_topic = editor_state.get("topic", "")
-            feasibility_score = editor_state.get("feasibility_score")
-            event_category = editor_state.get("event_category")
-            target_date = editor_state.get("target_date")
-            quantifiability_briefing = editor_state.get("quantifiability_briefing", "")
-            oracle_briefing = editor_state.get("oracle_briefing", "")
-            market_demand_briefing = editor_state.get("market_demand_briefing", "")
-            compliance_risk_briefing = editor_state.get("compliance_risk_briefing", "")
-            references = editor_state.get("references", [])
-        else:
-            # 直接从 state 提取
-            report = state.get("report", "")
-            inner_topic = state.get("topic", "")
-            feasibility_score = state.get("feasibility_score")
-            event_category = state.get("event_category")
-            target_date = state.get("target_date")
-            quantifiability_briefing = state.get("quantifiability_briefing", "")
-            oracle_briefing = state.get("oracle_briefing", "")
-            market_demand_briefing = state.get("market_demand_briefing", "")
-            compliance_risk_briefing = state.get("compliance_risk_briefing", "")
-            references = state.get("references", [])
+        report = src.get("report", "")
+        inner_topic = src.get("topic", "")
+        references = src.get("references", [])
+        state_fields = {key: src.get(key) for key in cls._OPTIONAL_STATE_FIELDS}
+        state_fields.update({key: src.get(key, "") for key in cls._BRIEFING_STATE_FIELDS})
         
         # 使用传入的 topic 作为备选
         final_topic = inner_topic or topic
@@ -156,14 +128,12 @@ class SearchResult:
             success=True,
             topic=final_topic,
             report=report,
-            feasibility_score=feasibility_score,
-            event_category=event_category,
-            target_date=target_date,
             job_id=job_id,
-            quantifiability_briefing=quantifiability_briefing,
-            oracle_briefing=oracle_briefing,
-            market_demand_briefing=market_demand_briefing,
-            compliance_risk_briefing=compliance_risk_briefing,
             references=references if isinstance(references, list) else [],
-            elapsed_time=elapsed_time
+            elapsed_time=elapsed_time,
+            **state_fields
         )
+
+
+# 字段名按声明顺序缓存，供 to_dict 使用
+_FIELD_NAMES = tuple(f.name for f in fields(SearchResult))
@@ -2,28 +2,40 @@
 Search - 事件期货可行性分析的主入口
 """
 
+import asyncio
 import os
 import time
 import uuid
 import logging
-from typing import Optional, Callable, Awaitable, Any
+from typing import Optional, Callable, Awaitable, Any, Dict, List, Sequence, Union
 from pathlib import Path
 
 # 自动加载 .env 文件
 from dotenv import load_dotenv
 
-# 从 market-agent 根目录加载 .env
-_package_root = Path(__file__).parent.parent  # market_agent 的父目录即 market-agent
-_env_path = _package_root / ".env"
+# 进程内只加载一次 .env（测试脚本使用同一标记，避免重复解析）
+_ENV_LOADED_FLAG = "_MARKET_AGENT_ENV_LOADED"
 
-if _env_path.exists():
-    load_dotenv(_env_path)
-else:
-    # 备选：尝试默认加载
-    load_dotenv()
+if not os.environ.get(_ENV_LOADED_FLAG):
+    # 从 market-agent 根目录加载 .env
+    _package_root = Path(__file__).parent.parent  # market_agent 的父目录即 market-agent
+    _env_path = _package_root / ".env"
+
+    if _env_path.exists():
+        load_dotenv(_env_path)
+    else:
+        # 备选：尝试默认加载
+        load_dotenv()
+    os.environ[_ENV_LOADED_FLAG] = "1"
 
 from .result import SearchResult
 
+try:
+    import uvloop
+    _loop_factory = uvloop.new_event_loop
+except ImportError:
+    _loop_factory = None
+
 logger = logging.getLogger(__name__)
 
 # 进度回调类型定义
@@ -57,6 +69,7 @@ class Search:
         "briefing": "简报生成",
         "editor": "报告编译",
     }
+    _NODE_KEY_SET = frozenset(NODE_NAMES)
     
     @staticmethod
     async def go(
@@ -112,56 +125,71 @@ class Search:
             job_id = f"search-{uuid.uuid4().hex[:12]}"
         
         # 记录开始时间
-        start_time = time.time()
+        start_time = time.monotonic()
+        job = None
+        forward_task = None
         
         try:
             # 延迟导入，避免循环依赖
             from workflow.backend.graph import Graph
+            from workflow.backend.classes.state import get_or_create_job
+            from workflow.backend.utils.http_client import shared_http_client_lease
             
             # 通知开始
             if on_progress:
                 await on_progress("system", "started", f"开始分析: {topic}")
             
-            # 创建工作流
-            graph = Graph(
-                topic=topic,
-                event_category=event_category,
-                target_date=target_date or "",
-                job_id=job_id
-            )
+            # 注册任务，节点推送到任务事件流的进度事件转发给回调
+            job = get_or_create_job(job_id)
+            if on_progress:
+                forward_task = asyncio.create_task(Search._forward_events(job["events"], on_progress))
+                # 让转发任务先完成订阅，避免漏掉最早的事件
+                await asyncio.sleep(0)
+            
+            # 持有本事件循环共享的 HTTP 连接池；最后一个使用者退出时关闭
+            async with shared_http_client_lease() as http_client:
+                # 创建工作流
+                graph = Graph(
+                    topic=topic,
+                    event_category=event_category,
+                    target_date=target_date or "",
+                    job_id=job_id,
+                    http_client=http_client
+                )
             
-            thread = {"configurable": {"thread_id": job_id}}
+                thread = {"configurable": {"thread_id": job_id}}
             
-            # 跟踪已完成的节点
-            completed_nodes = set()
-            final_state = None
+                # 跟踪已完成的节点
+                completed_nodes = set()
+                final_state = None
             
-            # 执行工作流
-            async for state in graph.run(thread):
-                # 检测当前完成的节点
-                for node_key in state.keys():
-                    if node_key not in completed_nodes and node_key in Search.NODE_NAMES:
-                        completed_nodes.add(node_key)
-                        
-                        # 触发进度回调
-                        if on_progress:
-                            node_name = Search.NODE_NAMES.get(node_key, node_key)
+                # 执行工作流
+                async for state in graph.run(thread):
+                    # 检测当前完成的节点（一次集合运算得到新完成的节点）
+                    new_nodes = (state.keys() & Search._NODE_KEY_SET) - completed_nodes
+                    completed_nodes |= new_nodes
+                
+                    # 触发进度回调（new_nodes 均来自 NODE_NAMES，可直接取名称）
+                    if on_progress:
+                        for node_key in new_nodes:
                             await on_progress(
                                 node_key, 
                                 "completed", 
-                                f"✓ {node_name} 完成"
+                                f"✓ {Search.NODE_NAMES[node_key]} 完成"
                             )
                 
-                # 检查是否生成了最终报告
-                if "editor" in state and isinstance(state.get("editor"), dict):
-                    if state["editor"].get("report"):
-                        final_state = state
-                        break
+                    # 检查是否生成了最终报告
+                    if "editor" in state and isinstance(state.get("editor"), dict):
+                        if state["editor"].get("report"):
+                            final_state = state
+                            break
                 
-                # 备份最新状态
-                final_state = state
+                    # 备份最新状态
+                    final_state = state
             
-            elapsed_time = time.time() - start_time
+            # 先转发完节点事件，再发送完成通知
+            await Search._close_job(job_id, forward_task)
+            elapsed_time = time.monotonic() - start_time
             
             # 构建结果
             if final_state is None:
@@ -191,7 +219,7 @@ class Search:
             return result
             
         except ImportError as e:
-            elapsed_time = time.time() - start_time
+            elapsed_time = time.monotonic() - start_time
             error_msg = f"无法导入工作流模块: {str(e)}"
             logger.error(error_msg)
             
@@ -206,7 +234,7 @@ class Search:
             )
             
         except Exception as e:
-            elapsed_time = time.time() - start_time
+            elapsed_time = time.monotonic() - start_time
             error_msg = f"工作流执行失败: {str(e)}"
             logger.exception(error_msg)
             
@@ -223,6 +251,30 @@ class Search:
                     "elapsed_time": elapsed_time
                 }
             )
+        finally:
+            if job is not None:
+                await Search._close_job(job_id, forward_task)
+    
+    @staticmethod
+    async def _forward_events(events: Any, on_progress: ProgressCallback) -> None:
+        """把任务事件流中带 message 的事件转发给进度回调（逐块的 report_chunk 不转发）"""
+        async for event in events.subscribe():
+            if not isinstance(event, dict) or not event.get("message"):
+                continue
+            try:
+                await on_progress(event.get("step", "system"), event.get("type", "progress"), event["message"])
+            except Exception as e:
+                logger.warning(f"进度回调失败: {e}")
+    
+    @staticmethod
+    async def _close_job(job_id: str, forward_task: Optional["asyncio.Task[None]"]) -> None:
+        """结束任务事件流并注销任务，等待转发完成；可重复调用"""
+        from workflow.backend.classes.state import job_status
+        
+        if (job := job_status.pop(job_id, None)) is not None:
+            job["events"].close()
+        if forward_task is not None:
+            await forward_task
     
     @staticmethod
     def go_sync(
@@ -245,12 +297,53 @@ class Search:
         Returns:
             SearchResult: 结构化的分析结果
         """
-        import asyncio
-        
-        return asyncio.run(Search.go(
+        return Search._run(Search.go(
             topic=topic,
             event_category=event_category,
             target_date=target_date,
             job_id=job_id,
             on_progress=None
         ))
+    
+    @staticmethod
+    def go_many_sync(
+        topics: Sequence[Union[str, Dict[str, Any]]],
+        concurrency: int = 4,
+    ) -> List[SearchResult]:
+        """
+        同步批量分析多个话题（不支持进度回调）
+        
+        所有话题在同一个事件循环中有界并发执行，避免逐个调用 go_sync
+        时反复创建和销毁事件循环。
+        
+        Args:
+            topics: 话题列表，每项为话题字符串，或 go_sync 参数字典
+                例如: {"topic": "...", "event_category": "...", "target_date": "..."}
+            concurrency: 同时执行的话题数上限（默认 4）
+        
+        Returns:
+            List[SearchResult]: 与 topics 顺序一致的分析结果
+        """
+        async def run_all() -> List[SearchResult]:
+            sem = asyncio.Semaphore(concurrency)
+            
+            async def run_bounded(item: Union[str, Dict[str, Any]]) -> SearchResult:
+                kwargs = {"topic": item} if isinstance(item, str) else dict(item)
+                async with sem:
+                    return await Search.go(**kwargs, on_progress=None)
+            
+            return await asyncio.gather(*(run_bounded(item) for item in topics))
+        
+        return Search._run(run_all())
+    
+    @staticmethod
+    def _run(coro: Awaitable[Any]) -> Any:
+        """在新事件循环中运行协程；已安装 uvloop 时使用 uvloop，不修改全局事件循环策略"""
+        from workflow.backend.utils.http_client import aclose_shared_http_client
+        
+        with asyncio.Runner(loop_factory=_loop_factory) as runner:
+            try:
+                return runner.run(coro)
+            finally:
+                # 事件循环关闭前释放该循环上共享的 HTTP 连接池
+                runner.run(aclose_shared_http_client())
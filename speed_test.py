@@ -6,9 +6,10 @@ import time
 from dotenv import load_dotenv
 load_dotenv()
 from workflow.backend.graph import Graph
+from workflow.backend.utils import aclose_shared_http_client
 
 async def test():
-    start = time.time()
+    start = time.monotonic()
     g = Graph(
         topic='复仇者联盟9会不会上映', 
         event_category='娱乐', 
@@ -16,11 +17,14 @@ async def test():
         job_id='speed-test-2'
     )
     thread = {'configurable': {'thread_id': 'speed-2'}}
-    async for state in g.run(thread):
-        if 'editor' in state and state['editor'].get('report'):
-            elapsed = time.time() - start
-            print(f'✅ 完成: {len(state["editor"]["report"])} 字符')
-            print(f'⏱️ 耗时: {elapsed:.1f} 秒')
-            break
+    try:
+        async for state in g.run(thread):
+            if 'editor' in state and state['editor'].get('report'):
+                elapsed = time.monotonic() - start
+                print(f'✅ 完成: {len(state["editor"]["report"])} 字符')
+                print(f'⏱️ 耗时: {elapsed:.1f} 秒')
+                break
+    finally:
+        await aclose_shared_http_client()
 
 asyncio.run(test())
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make the repo root importable (workflow/, market_agent/) when running pytest from anywhere
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
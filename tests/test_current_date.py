@@ -0,0 +1,36 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+pytest.importorskip("tavily")
+
+from workflow.backend.nodes.researchers import base
+
+
+class _FakeDatetime:
+    current = datetime(2025, 1, 2, 23, 59, 30)
+
+    @classmethod
+    def now(cls):
+        return cls.current
+
+
+def test_current_date_is_cached_until_ttl_expires(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(base, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(base, "datetime", _FakeDatetime)
+    monkeypatch.setattr(base, "_date_cache", (0.0, 0, ""))
+    monkeypatch.setattr(_FakeDatetime, "current", datetime(2025, 1, 2, 23, 59, 30))
+
+    assert base._current_date() == (2025, "2025年01月02日")
+
+    # The date rolls over, but the cached value is still within its TTL
+    _FakeDatetime.current = datetime(2025, 1, 3, 0, 0, 10)
+    clock.now += base._DATE_TTL - 1
+    assert base._current_date() == (2025, "2025年01月02日")
+
+    # Past the TTL the date is recomputed
+    clock.now += 2
+    assert base._current_date() == (2025, "2025年01月03日")
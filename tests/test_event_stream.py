@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from workflow.backend.classes.state import EventStream, get_or_create_job, job_status
+
+
+def test_get_or_create_job_returns_the_same_record():
+    try:
+        job = get_or_create_job("test-job")
+        assert get_or_create_job("test-job") is job
+        assert isinstance(job["events"], EventStream)
+    finally:
+        job_status.pop("test-job", None)
+
+
+def test_subscriber_receives_events_until_close():
+    async def scenario():
+        events = EventStream()
+        received = []
+
+        async def consume():
+            async for event in events.subscribe():
+                received.append(event)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        events.append({"type": "a"})
+        events.append({"type": "b"})
+        events.close()
+        await asyncio.wait_for(task, timeout=1)
+        return received, list(events)
+
+    received, buffered = asyncio.run(scenario())
+    assert received == [{"type": "a"}, {"type": "b"}]
+    assert buffered == received
+
+
+def test_subscribe_after_close_ends_immediately():
+    async def scenario():
+        events = EventStream()
+        events.close()
+        return [event async for event in events.subscribe()]
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=1)) == []
+
+
+def test_buffer_keeps_only_the_latest_events():
+    events = EventStream(maxlen=2)
+    for i in range(3):
+        events.append(i)
+    assert list(events) == [1, 2]
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from workflow.backend.nodes.editor import needs_sweep
+from workflow.backend.utils.references import format_references_section
+
+CLEAN_BODY = """# 比特币2025年突破15万美元 事件期货可行性报告
+
+## 事件概述
+比特币价格能否在2025年内突破15万美元。
+
+## 可量化性评估
+### 结算标准
+* 以主流交易所的公开报价为准
+**维度评分: 8/10**
+
+## 综合结论
+### 推荐决策
+谨慎上线(需附加条件)"""
+
+REFERENCES = ["https://www.coindesk.com/markets/btc", "https://www.reuters.com/markets/crypto"]
+REFERENCE_INFO = {
+    "https://www.coindesk.com/markets/btc": {"website": "CoinDesk", "title": "BTC Price Outlook"},
+    "https://www.reuters.com/markets/crypto": {"website": "Reuters", "title": "Crypto Markets"},
+}
+
+
+def test_clean_body_does_not_need_sweep():
+    assert not needs_sweep(CLEAN_BODY)
+
+
+def test_appended_references_do_not_trigger_sweep():
+    reference_text = format_references_section(REFERENCES, REFERENCE_INFO, {})
+    assert reference_text.startswith("## 参考资料")
+    assert not needs_sweep(f"{CLEAN_BODY}\n\n{reference_text}")
+
+
+def test_untidy_body_needs_sweep():
+    assert needs_sweep(CLEAN_BODY + "\n\n\n## 附录\n以下是补充说明")
@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from workflow.backend.nodes.researchers import OracleAnalyzer, MarketDemandAnalyzer
+from workflow.backend.nodes.researchers.base import SKIP_MIN_DOCS
+
+
+def _doc(title, content, score=0.9):
+    return {"title": title, "content": content, "score": score}
+
+
+def _seed_docs(analyzer):
+    # What a seed search returns: its query is "<topic> <LABEL>", so the label echoes back
+    query = analyzer.seed_query("比特币2025年突破15万美元")
+    return {f"https://example.com/seed/{i}": _doc(query, f"{query} 相关报道") for i in range(5)}
+
+
+def test_own_seed_search_does_not_skip_analyzer():
+    seeds = _seed_docs(OracleAnalyzer)
+    # Seed documents echo the analyzer's label, which carries its own keywords
+    assert all(any(kw in doc["title"] for kw in OracleAnalyzer.SKIP_KEYWORDS) for doc in seeds.values())
+
+    background = {"https://example.com/news": _doc("比特币行情", "价格走势回顾")}
+    # Coverage is decided on the event background alone; seeds never reach the check
+    assert not OracleAnalyzer.covered_by(background)
+
+
+def test_background_with_keyword_documents_skips_analyzer():
+    background = {
+        f"https://example.com/bg/{i}": _doc("交易所数据源", "以官方公告的数据源结算")
+        for i in range(SKIP_MIN_DOCS)
+    }
+    assert OracleAnalyzer.covered_by(background)
+    assert not MarketDemandAnalyzer.covered_by(background)
+
+
+def test_low_score_background_does_not_skip_analyzer():
+    background = {
+        f"https://example.com/bg/{i}": _doc("交易所数据源", "以官方公告的数据源结算", score=0.5)
+        for i in range(SKIP_MIN_DOCS)
+    }
+    assert not OracleAnalyzer.covered_by(background)
@@ -1,5 +1,6 @@
+import asyncio
 from typing import TypedDict, NotRequired, Required, Dict, List, Any
-from collections import defaultdict
+from collections import deque
 from datetime import datetime
 
 #Define the input state for Event Futures Feasibility Analysis
@@ -13,6 +14,9 @@ class InputState(TypedDict, total=False):
 class ResearchState(InputState):
     # 初始搜索数据
     event_background: Dict[str, Any]        # 事件背景信息
+    analyst_queries: Dict[str, List[str]]   # 各分析维度预先生成的搜索查询
+    analyst_seeds: Dict[str, Dict[str, Any]]  # 各分析维度的基线搜索结果 (按URL)
+    skipped_analysts: List[str]             # 背景信息已覆盖、无需再搜索的分析维度
     messages: List[Any]
     
     # 四个维度的原始分析数据
@@ -39,14 +43,68 @@ class ResearchState(InputState):
     feasibility_score: float                # 综合可行性评分 (0-10)
     report: str                             # 最终可行性报告
 
-# Global job status tracker - shared across application.py and backend nodes
-job_status = defaultdict[Any, dict[str, str | list[Any] | None]](lambda: {
-    "status": "pending",
-    "result": None,
-    "error": None,
-    "debug_info": [],
-    "company": None,
-    "report": None,
-    "last_update": datetime.now().isoformat(),
-    "events": []  # Queue for events from parallel nodes
-})
\ No newline at end of file
+# 每个任务保留的最近事件数量上限，超出后丢弃最旧的事件 (如逐块的 report_chunk)
+MAX_EVENTS = 2048
+MAX_DEBUG_INFO = 256
+
+_END_OF_STREAM = object()
+
+
+class EventStream(deque):
+    """有界事件缓冲区，同时把新事件推送给 subscribe() 的消费者，无需轮询列表。"""
+
+    def __init__(self, iterable=(), maxlen=MAX_EVENTS):
+        super().__init__(iterable, maxlen)
+        self._subscribers: list[asyncio.Queue] = []
+        self._closed = False
+
+    def append(self, event: Any) -> None:
+        super().append(event)
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass  # 消费者跟不上时丢弃，与缓冲区丢弃最旧事件的语义一致
+
+    def close(self) -> None:
+        """通知所有消费者事件流已结束；之后的 subscribe() 立即结束。"""
+        self._closed = True
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(_END_OF_STREAM)
+            except asyncio.QueueFull:
+                queue.get_nowait()
+                queue.put_nowait(_END_OF_STREAM)
+
+    async def subscribe(self):
+        """异步迭代之后追加的事件，直到 close() 被调用。"""
+        if self._closed:
+            return
+        queue = asyncio.Queue(maxsize=self.maxlen or 0)
+        self._subscribers.append(queue)
+        try:
+            while (event := await queue.get()) is not _END_OF_STREAM:
+                yield event
+        finally:
+            self._subscribers.remove(queue)
+
+
+# Global job status tracker - shared across application.py and backend nodes.
+# Entries are created explicitly via get_or_create_job(); lookups never create them.
+job_status: dict[Any, dict[str, str | list[Any] | deque | None]] = {}
+
+
+def get_or_create_job(job_id: Any) -> dict[str, str | list[Any] | deque | None]:
+    """返回任务状态记录，不存在时创建。"""
+    if (job := job_status.get(job_id)) is None:
+        job = job_status[job_id] = {
+            "status": "pending",
+            "result": None,
+            "error": None,
+            "debug_info": deque(maxlen=MAX_DEBUG_INFO),
+            "company": None,
+            "report": None,
+            "last_update": datetime.now().isoformat(),
+            "events": EventStream()  # Queue for events from parallel nodes
+        }
+    return job
@@ -1,16 +1,24 @@
 import logging
+import os
 from typing import Any, AsyncIterator, Dict
 
 from langchain_core.messages import SystemMessage
 from langgraph.graph import StateGraph
 
-from .classes.state import InputState
+try:
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:  # provided by the optional langgraph-checkpoint-sqlite package
+    AsyncSqliteSaver = None
+
+from .classes.state import InputState, job_status
 from .nodes import GroundingNode
 from .nodes.briefing import Briefing
 from .nodes.collector import Collector
 from .nodes.curator import Curator
 from .nodes.editor import Editor
 from .nodes.enricher import Enricher
+from .utils.http_client import get_shared_http_client
+from .utils.inflight import request_key
 from .nodes.researchers import (
     QuantifiabilityAnalyzer,
     OracleAnalyzer,
@@ -20,8 +28,13 @@ from .nodes.researchers import (
 
 logger = logging.getLogger(__name__)
 
+# SQLite checkpoint store used to resume interrupted runs. Opt-in: unset means no
+# checkpointing; a relative path resolves against the process working directory.
+# Threads are deleted once a run finishes, so the file only holds interrupted runs.
+CHECKPOINT_PATH = os.getenv("GRAPH_CHECKPOINT_PATH", "")
+
 class Graph:
-    def __init__(self, topic=None, event_description=None, event_category=None, target_date=None, job_id=None):
+    def __init__(self, topic=None, event_description=None, event_category=None, target_date=None, job_id=None, http_client=None):
         # Initialize InputState for Event Futures Feasibility Analysis
         self.input_state = InputState(
             topic=topic,
@@ -34,22 +47,28 @@ class Graph:
             ]
         )
 
+        # Optional shared httpx.AsyncClient, reused by every LLM node so that
+        # batch runs keep one warm connection pool across topics; defaults to
+        # the process-wide client of the running event loop
+        self.http_client = http_client or get_shared_http_client()
+
         # Initialize nodes
         self._init_nodes()
         self._build_workflow()
+        self.compiled_graph = self.workflow.compile()
 
     def _init_nodes(self):
         """Initialize all workflow nodes"""
-        self.ground = GroundingNode()
-        self.quantifiability_analyzer = QuantifiabilityAnalyzer()
-        self.oracle_analyzer = OracleAnalyzer()
-        self.market_demand_analyzer = MarketDemandAnalyzer()
-        self.compliance_risk_analyzer = ComplianceRiskAnalyzer()
+        self.ground = GroundingNode(http_client=self.http_client)
+        self.quantifiability_analyzer = QuantifiabilityAnalyzer(http_client=self.http_client)
+        self.oracle_analyzer = OracleAnalyzer(http_client=self.http_client)
+        self.market_demand_analyzer = MarketDemandAnalyzer(http_client=self.http_client)
+        self.compliance_risk_analyzer = ComplianceRiskAnalyzer(http_client=self.http_client)
         self.collector = Collector()
         self.curator = Curator()
         self.enricher = Enricher()
-        self.briefing = Briefing()
-        self.editor = Editor()
+        self.briefing = Briefing(http_client=self.http_client)
+        self.editor = Editor(http_client=self.http_client)
 
     def _build_workflow(self):
         """Configure the state graph workflow"""
@@ -57,10 +76,10 @@ class Graph:
         
         # Add nodes with their respective processing functions
         self.workflow.add_node("grounding", self.ground.run)
-        self.workflow.add_node("quantifiability_analyzer", self.quantifiability_analyzer.run)
-        self.workflow.add_node("oracle_analyzer", self.oracle_analyzer.run)
-        self.workflow.add_node("market_demand_analyzer", self.market_demand_analyzer.run)
-        self.workflow.add_node("compliance_risk_analyzer", self.compliance_risk_analyzer.run)
+        self.workflow.add_node("quantifiability_analyzer", self.quantifiability_analyzer.analyze)
+        self.workflow.add_node("oracle_analyzer", self.oracle_analyzer.analyze)
+        self.workflow.add_node("market_demand_analyzer", self.market_demand_analyzer.analyze)
+        self.workflow.add_node("compliance_risk_analyzer", self.compliance_risk_analyzer.analyze)
         self.workflow.add_node("collector", self.collector.run)
         self.workflow.add_node("curator", self.curator.run)
         self.workflow.add_node("enricher", self.enricher.run)
@@ -92,14 +111,67 @@ class Graph:
 
     async def run(self, thread: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """Execute the feasibility analysis workflow"""
-        compiled_graph = self.workflow.compile()
-        
-        async for state in compiled_graph.astream(
-            self.input_state,
-            thread
-        ):
-            yield state
+        try:
+            if AsyncSqliteSaver is None or not CHECKPOINT_PATH:
+                async for state in self.compiled_graph.astream(
+                    self.input_state,
+                    thread
+                ):
+                    yield state
+                return
+            
+            thread = self._checkpoint_thread(thread)
+            async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_PATH) as checkpointer:
+                # Attach the checkpointer without recompiling the graph
+                compiled_graph = self.compiled_graph.copy(update={"checkpointer": checkpointer})
+                
+                # A thread with pending nodes was interrupted; resume after its last completed node
+                snapshot = await compiled_graph.aget_state(thread)
+                if snapshot.next:
+                    logger.info(f"Resuming thread from checkpoint before {snapshot.next}")
+                    graph_input = None
+                else:
+                    graph_input = self.input_state
+                
+                finished = False
+                try:
+                    async for state in compiled_graph.astream(
+                        graph_input,
+                        thread
+                    ):
+                        # Editor is the last node; callers usually stop iterating once it reports
+                        finished = finished or "editor" in state
+                        yield state
+                finally:
+                    if finished:
+                        await checkpointer.adelete_thread(thread["configurable"]["thread_id"])
+        finally:
+            # Wake up anyone awaiting this job's events
+            job_id = self.input_state.get('job_id')
+            if job_id in job_status:
+                job_status[job_id]["events"].close()
     
+    def _checkpoint_thread(self, thread: Dict[str, Any]) -> Dict[str, Any]:
+        """Key the checkpoint thread on this run's input alone.
+
+        Caller thread ids are positional or per-job, so they neither identify the
+        topic nor survive a rerun; keying on the input lets a rerun of the same
+        topic resume where an interrupted run stopped.
+        """
+        configurable = thread.get("configurable", {})
+        fingerprint = request_key(
+            self.input_state.get("topic"),
+            self.input_state.get("event_description"),
+            self.input_state.get("event_category"),
+            self.input_state.get("target_date")
+        )[:12]
+        return {
+            **thread,
+            "configurable": {
+                **configurable,
+                "thread_id": f"run:{fingerprint}"
+            }
+        }
+
     def compile(self):
-        graph = self.workflow.compile()
-        return graph
+        return self.compiled_graph
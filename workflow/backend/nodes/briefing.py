@@ -1,29 +1,97 @@
 import asyncio
+import functools
+import hashlib
 import logging
 import os
-from typing import Any, Dict, List, Union
+import re
+from typing import Any, Dict, List, Tuple, Union
+
+try:
+    import tiktoken
+except ImportError:  # installed with langchain-openai; fall back to character counts
+    tiktoken = None
 
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from pydantic import BaseModel, Field
 
 from ..classes import ResearchState
 from ..classes.state import job_status
+from ..utils.inflight import coalesce, request_key
+from ..utils.llm_cache import get_llm_cache
+from ..utils.rate_limit import LLM_RATE_LIMITER
+from ..utils.ttl_cache import AsyncTTLCache
 from ..prompts import (
     QUANTIFIABILITY_BRIEFING_PROMPT,
     ORACLE_BRIEFING_PROMPT,
     MARKET_DEMAND_BRIEFING_PROMPT,
     COMPLIANCE_RISK_BRIEFING_PROMPT,
-    BRIEFING_ANALYSIS_INSTRUCTION
+    BRIEFING_ANALYSIS_INSTRUCTION,
+    BRIEFING_COMBINED_INSTRUCTION,
+    BRIEFING_EVENT_CONTEXT
 )
 
 logger = logging.getLogger(__name__)
 
+# Set BRIEFING_SINGLE_CALL=1 to generate all category briefings in one LLM request
+SINGLE_CALL = os.getenv("BRIEFING_SINGLE_CALL", "").lower() in ("1", "true", "yes")
+
+# Process-wide briefing reuse across Graph instances, keyed on category,
+# normalized topic, event category, target date and the top-ranked document
+# URLs; entries expire with the search results they were written from
+_briefing_cache = AsyncTTLCache(maxsize=128, ttl=3600)
+_BRIEFING_CACHE_TOP_DOCS = 5
+_TOPIC_NOISE = re.compile(r'[\W_]+')
+_DOC_SEPARATOR = "\n" + "-" * 40 + "\n"
+
+
+class CategoryBriefings(BaseModel):
+    """Structured output of the single-call briefing request."""
+    quantifiability: str = Field(default="", description="可量化性评估简报")
+    oracle: str = Field(default="", description="预言机与结算机制评估简报")
+    market_demand: str = Field(default="", description="市场需求与合约设计简报")
+    compliance_risk: str = Field(default="", description="合规与风险评估简报")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the GPT-4o tokenizer once; None when tiktoken is unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        logger.warning(f"Falling back to character counts for document truncation: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def _format_doc_entry(title: str, content: str, max_doc_length: int) -> Tuple[str, int]:
+    """Truncate and format one document; shared documents are formatted once across categories.
+
+    Returns the entry and its length in tokens, or in characters without tiktoken.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        if len(content) > max_doc_length:
+            content = content[:max_doc_length] + "... [内容已截断]"
+        doc_entry = f"标题: {title}\n\n内容: {content}"
+        return doc_entry, len(doc_entry)
+    
+    tokens = encoding.encode(content, disallowed_special=())
+    if len(tokens) > max_doc_length:
+        content = encoding.decode(tokens[:max_doc_length]) + "... [内容已截断]"
+    doc_entry = f"标题: {title}\n\n内容: {content}"
+    return doc_entry, min(len(tokens), max_doc_length) + len(encoding.encode(title, disallowed_special=())) + 8
+
 class Briefing:
     """为每个分析维度创建简报并更新 ResearchState。"""
     
-    def __init__(self) -> None:
+    def __init__(self, http_client=None) -> None:
+        # Document budgets are in GPT-4o tokens (characters when tiktoken is unavailable)
         self.max_doc_length = 8000  # Maximum document content length
+        self.max_total_length = 100000 if _get_encoding() else 120000
         openai_key = os.getenv("OPENAI_API_KEY")
         openai_base = os.getenv("OPENAI_BASE_URL", "http://4.216.184.165:3000/v1")
         if not openai_key:
@@ -33,33 +101,74 @@ class Briefing:
             model="gpt-4o",
             temperature=0,
             api_key=openai_key,
-            base_url=openai_base
+            base_url=openai_base,
+            http_async_client=http_client,
+            cache=get_llm_cache()
         )
+        
+        # Create LCEL chain for briefing generation. The static category prompt
+        # leads so the prefix is byte-identical across events and hits the
+        # provider's prompt cache; event details and documents follow.
+        briefing_prompt = ChatPromptTemplate.from_messages([
+            ("system", "{category_prompt}"),
+            ("user", BRIEFING_EVENT_CONTEXT + """
+
+{instruction}
+
+{documents}""")
+        ])
+        self.chain = briefing_prompt | self.llm | StrOutputParser()
+        
+        # Single-call variant: every requested category prompt and document group in one request
+        combined_prompt = ChatPromptTemplate.from_messages([
+            ("system", BRIEFING_COMBINED_INSTRUCTION + "\n\n{category_prompts}"),
+            ("user", BRIEFING_EVENT_CONTEXT + """
+
+{instruction}
+
+{documents}""")
+        ])
+        self.combined_chain = combined_prompt | self.llm.with_structured_output(CategoryBriefings)
+
+    _CATEGORY_PROMPTS = {
+        'quantifiability': QUANTIFIABILITY_BRIEFING_PROMPT,
+        'oracle': ORACLE_BRIEFING_PROMPT,
+        'market_demand': MARKET_DEMAND_BRIEFING_PROMPT,
+        'compliance_risk': COMPLIANCE_RISK_BRIEFING_PROMPT,
+    }
 
     def _get_category_prompt(self, category: str) -> str:
         """获取特定分析维度的 prompt 模板"""
-        prompts = {
-            'quantifiability': QUANTIFIABILITY_BRIEFING_PROMPT,
-            'oracle': ORACLE_BRIEFING_PROMPT,
-            'market_demand': MARKET_DEMAND_BRIEFING_PROMPT,
-            'compliance_risk': COMPLIANCE_RISK_BRIEFING_PROMPT,
-        }
-        return prompts.get(category, 
-                          "基于提供的文档，为事件'{topic}'创建一份专业的可行性分析简报。")
+        return self._CATEGORY_PROMPTS.get(category, 
+                          "基于提供的文档，为给定事件创建一份专业的可行性分析简报。")
     
-    def _prepare_documents(self, docs: Union[Dict[str, Any], List[Dict[str, Any]]]) -> str:
-        """准备和格式化文档用于简报生成"""
-        # Normalize docs to list of (url, doc) tuples
-        items = list(docs.items()) if isinstance(docs, dict) else [
+    @staticmethod
+    def _sorted_doc_items(docs: Union[Dict[str, Any], List[Dict[str, Any]]]) -> List[tuple]:
+        """Normalize docs to (url, doc) tuples sorted by evaluation score."""
+        items = docs.items() if isinstance(docs, dict) else (
             (doc.get('url', f'doc_{i}'), doc) for i, doc in enumerate(docs)
-        ]
-        
-        # Sort by evaluation score
-        sorted_items = sorted(
+        )
+        # sorted() evaluates the key once per item, so the score is parsed only once
+        return sorted(
             items, 
             key=lambda x: float(x[1].get('evaluation', {}).get('overall_score', '0')), 
             reverse=True
         )
+
+    def _briefing_cache_key(
+        self, sorted_items: List[tuple], category: str, context: Dict[str, Any]
+    ) -> str:
+        """Build the briefing cache key from the top documents rather than the full prompt."""
+        top_urls = sorted(url for url, _ in sorted_items[:_BRIEFING_CACHE_TOP_DOCS])
+        topic = _TOPIC_NOISE.sub('', str(context.get('topic', ''))).casefold()
+        raw = "\n".join([
+            category, topic, str(context.get('event_category', '')), str(context.get('target_date', '')), *top_urls
+        ])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def _prepare_documents(self, sorted_items: List[tuple], max_total_length: int = None) -> str:
+        """准备和格式化按评分排序的文档用于简报生成"""
+        max_total_length = max_total_length or self.max_total_length
         
         # Format documents with length limits
         doc_texts = []
@@ -68,18 +177,14 @@ class Briefing:
             title = doc.get('title', '')
             content = doc.get('raw_content') or doc.get('content', '')
             
-            if len(content) > self.max_doc_length:
-                content = content[:self.max_doc_length] + "... [内容已截断]"
-            
-            doc_entry = f"标题: {title}\n\n内容: {content}"
-            if total_length + len(doc_entry) < 120000:  # Keep under limit
+            doc_entry, entry_length = _format_doc_entry(title, content, self.max_doc_length)
+            if total_length + entry_length < max_total_length:  # Keep under limit
                 doc_texts.append(doc_entry)
-                total_length += len(doc_entry)
+                total_length += entry_length
             else:
                 break
         
-        separator = "\n" + "-" * 40 + "\n"
-        return f"{separator}{separator.join(doc_texts)}{separator}"
+        return f"{_DOC_SEPARATOR}{_DOC_SEPARATOR.join(doc_texts)}{_DOC_SEPARATOR}"
 
     async def generate_category_briefing(
         self, docs: Union[Dict[str, Any], List[Dict[str, Any]]], 
@@ -110,30 +215,48 @@ class Briefing:
         
         yield event
 
-        # Get category-specific prompt and prepare documents
-        category_prompt = self._get_category_prompt(category).format(
-            topic=topic, event_category=event_category, target_date=target_date
-        )
-        formatted_docs = self._prepare_documents(docs)
-        
-        # Create LCEL chain for briefing generation
-        briefing_prompt = ChatPromptTemplate.from_messages([
-            ("user", """{category_prompt}
+        # Reuse a briefing already generated for an equivalent topic and document set
+        sorted_items = self._sorted_doc_items(docs)
+        cache_key = self._briefing_cache_key(sorted_items, category, context)
+        if (cached := _briefing_cache.get(cache_key)) is not None:
+            logger.info(f"Reusing cached {category} briefing for {topic}")
+            event = {
+                "type": "briefing_complete",
+                "category": category,
+                "content_length": len(cached),
+                "step": "简报生成",
+                "cached": True
+            }
+            
+            if job_id:
+                try:
+                    if job_id in job_status:
+                        job_status[job_id]["events"].append(event)
+                except Exception as e:
+                    logger.error(f"Error appending briefing_complete event: {e}")
+            
+            yield event
+            yield {'content': cached}
+            return
 
-{instruction}
+        # Get category-specific prompt and prepare documents
+        category_prompt = self._get_category_prompt(category)
+        formatted_docs = self._prepare_documents(sorted_items)
 
-{documents}""")
-        ])
-        
-        chain = briefing_prompt | self.llm | StrOutputParser()
         
         try:
             logger.info("Sending prompt to LLM")
-            content = await chain.ainvoke({
+            inputs = {
                 "category_prompt": category_prompt,
+                "topic": topic,
+                "event_category": event_category,
+                "target_date": target_date,
                 "instruction": BRIEFING_ANALYSIS_INSTRUCTION,
                 "documents": formatted_docs
-            })
+            }
+            # Identical concurrent requests share a single LLM round-trip
+            async with LLM_RATE_LIMITER:
+                content = await coalesce(request_key("briefing", inputs), lambda: self.chain.ainvoke(inputs))
             
             if not content:
                 logger.error(f"Empty response from LLM for {category} briefing")
@@ -156,12 +279,101 @@ class Briefing:
                 except Exception as e:
                     logger.error(f"Error appending briefing_complete event: {e}")
             
+            content = content.strip()
+            _briefing_cache.set(cache_key, content)
+            
             yield event
-            yield {'content': content.strip()}
+            yield {'content': content}
         except Exception as e:
             logger.error(f"Error generating {category} briefing: {e}")
             raise RuntimeError(f"Fatal API error - {category} briefing generation failed: {str(e)}") from e
 
+    async def generate_combined_briefings(
+        self, tasks: List[Dict[str, Any]], context: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """Generate the briefings for all tasks with one structured-output LLM call."""
+        topic = context.get('topic', 'Unknown')
+        job_id = context.get('job_id')
+        categories = [task['category'] for task in tasks]
+        logger.info(f"Generating {', '.join(categories)} briefings for {topic} in a single call")
+        
+        for category in categories:
+            event = {"type": "briefing_start", "category": category, "step": "简报生成"}
+            if job_id:
+                try:
+                    if job_id in job_status:
+                        job_status[job_id]["events"].append(event)
+                except Exception as e:
+                    logger.error(f"Error appending briefing_start event: {e}")
+        
+        # Reuse briefings already generated for an equivalent topic and document set
+        sorted_items = {task['category']: self._sorted_doc_items(task['curated_data']) for task in tasks}
+        cache_keys = {
+            category: self._briefing_cache_key(sorted_items[category], category, context) for category in categories
+        }
+        contents = {
+            category: cached for category in categories
+            if (cached := _briefing_cache.get(cache_keys[category])) is not None
+        }
+        if contents:
+            logger.info(f"Reusing cached {', '.join(contents)} briefings for {topic}")
+        missing = [category for category in categories if category not in contents]
+        if missing:
+            contents.update(await self._generate_missing_briefings(missing, sorted_items, context))
+            for category in missing:
+                if contents[category]:
+                    _briefing_cache.set(cache_keys[category], contents[category])
+        
+        for category in categories:
+            event = {
+                "type": "briefing_complete",
+                "category": category,
+                "content_length": len(contents[category]),
+                "step": "简报生成"
+            }
+            if category not in missing:
+                event["cached"] = True
+            if job_id:
+                try:
+                    if job_id in job_status:
+                        job_status[job_id]["events"].append(event)
+                except Exception as e:
+                    logger.error(f"Error appending briefing_complete event: {e}")
+        
+        return {category: contents[category] for category in categories}
+
+    async def _generate_missing_briefings(
+        self, categories: List[str], sorted_items: Dict[str, List[tuple]], context: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """Run the single structured-output request for the categories not found in the cache."""
+        # The documents of all categories share one context window
+        budget = self.max_total_length // len(categories)
+        inputs = {
+            "category_prompts": "\n\n".join(
+                f"=== {category} ===\n{self._get_category_prompt(category)}" for category in categories
+            ),
+            "topic": context.get('topic', 'Unknown'),
+            "event_category": context.get('event_category', 'Unknown'),
+            "target_date": context.get('target_date', 'Unknown'),
+            "instruction": BRIEFING_ANALYSIS_INSTRUCTION,
+            "documents": "\n\n".join(
+                f"=== {category} 文档 ===\n{self._prepare_documents(sorted_items[category], budget)}"
+                for category in categories
+            )
+        }
+        
+        try:
+            async with LLM_RATE_LIMITER:
+                result = await coalesce(
+                    request_key("combined_briefing", inputs),
+                    lambda: self.combined_chain.ainvoke(inputs)
+                )
+        except Exception as e:
+            logger.error(f"Error generating combined briefings: {e}")
+            raise RuntimeError(f"Fatal API error - combined briefing generation failed: {str(e)}") from e
+        
+        return {category: (getattr(result, category, "") or "").strip() for category in categories}
+
     async def create_briefings(self, state: ResearchState) -> ResearchState:
         """并行创建所有维度的简报。"""
         topic = state.get('topic', 'Unknown Topic')
@@ -202,8 +414,17 @@ class Briefing:
                 logger.info(f"No data available for {data_field}")
                 state[briefing_key] = ""
 
+        if SINGLE_CALL and len(briefing_tasks) > 1:
+            contents = await self.generate_combined_briefings(briefing_tasks, context)
+            for task in briefing_tasks:
+                if not (content := contents.get(task['category'])):
+                    raise RuntimeError(f"Empty briefing generated for {task['data_field']}")
+                briefings[task['category']] = content
+                state[task['briefing_key']] = content
+                logger.info(f"Completed {task['data_field']} briefing ({len(content)} characters)")
+
         # Process briefings in parallel with rate limiting
-        if briefing_tasks:
+        elif briefing_tasks:
             briefing_semaphore = asyncio.Semaphore(4)  # Allow all 4 briefings in parallel
             
             async def process_briefing(task: Dict[str, Any]) -> Dict[str, Any]:
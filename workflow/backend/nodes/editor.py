@@ -1,28 +1,73 @@
+import asyncio
 import logging
 import os
-from typing import Dict
+import re
+from typing import Dict, Tuple
 
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps
 from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 from ..classes import ResearchState
 from ..classes.state import job_status
+from ..utils.llm_cache import get_llm_cache
+from ..utils.rate_limit import LLM_RATE_LIMITER
 from ..utils.references import format_references_section
+from .researchers import (
+    QuantifiabilityAnalyzer,
+    OracleAnalyzer,
+    MarketDemandAnalyzer,
+    ComplianceRiskAnalyzer,
+)
 from ..prompts import (
     EDITOR_SYSTEM_MESSAGE,
     COMPILE_CONTENT_PROMPT,
     CONTENT_SWEEP_SYSTEM_MESSAGE,
-    CONTENT_SWEEP_PROMPT
+    CONTENT_SWEEP_PROMPT,
+    SECTION_SWEEP_PROMPT,
+    COMPILE_AND_SWEEP_SYSTEM_MESSAGE,
+    COMPILE_AND_SWEEP_PROMPT
 )
 
 logger = logging.getLogger(__name__)
 
+# Set EDITOR_TWO_PASS=1 to run the separate compile and sweep LLM passes
+TWO_PASS = os.getenv("EDITOR_TWO_PASS", "").lower() in ("1", "true", "yes")
+
+_SENTENCE_BOUNDARY = re.compile(r"[.!?\n。！？]")
+_SECTION_SPLIT = re.compile(r"(?m)^(?=## )")
+_LEADING_TITLE = re.compile(r"\A# [^\n]*\n*")
+
+# Cheap checks for what the sweep pass fixes; a report passing all of them skips it
+_ALLOWED_HEADINGS = frozenset({
+    "事件概述", "可量化性评估", "预言机与结算机制", "市场需求分析",
+    "合规与风险评估", "综合结论", "参考资料"
+})
+_HEADING_LINE = re.compile(r"(?m)^## +(.+?)\s*$")
+_SWEEP_MARKERS = re.compile(r"```|TODO|TBD|<<|以下是|\n\n\n")
+
+_ANALYST_LABELS = {
+    analyzer.ANALYST_TYPE: analyzer.LABEL
+    for analyzer in (QuantifiabilityAnalyzer, OracleAnalyzer, MarketDemandAnalyzer, ComplianceRiskAnalyzer)
+}
+
+def needs_sweep(report: str) -> bool:
+    """判断编译后的报告是否仍需要内容清理 (标题重复或不规范、代码块、元评论、多余空行)。"""
+    if not report.lstrip().startswith("# "):
+        return True
+    headings = _HEADING_LINE.findall(report)
+    if len(headings) != len(set(headings)) or not _ALLOWED_HEADINGS.issuperset(headings):
+        return True
+    return _SWEEP_MARKERS.search(report) is not None
+
 class Editor:
     """将各维度简报编译成完整的事件期货可行性报告。"""
     
-    def __init__(self) -> None:
+    def __init__(self, http_client=None) -> None:
         openai_key = os.getenv("OPENAI_API_KEY")
         openai_base = os.getenv("OPENAI_BASE_URL", "http://4.216.184.165:3000/v1")
         if not openai_key:
@@ -34,9 +79,28 @@ class Editor:
             temperature=0,
             streaming=True,
             api_key=openai_key,
-            base_url=openai_base
+            base_url=openai_base,
+            http_async_client=http_client,
+            cache=get_llm_cache()
         )
         
+        # The sweep only cleans up formatting, so a smaller model is sufficient
+        self.sweep_llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0,
+            streaming=True,
+            api_key=openai_key,
+            base_url=openai_base,
+            http_async_client=http_client,
+            cache=get_llm_cache()
+        )
+        
+        # Build the LCEL chains once; only the inputs change between runs
+        self.compile_chain = self._build_chain(EDITOR_SYSTEM_MESSAGE, COMPILE_CONTENT_PROMPT)
+        self.sweep_chain = self._build_chain(CONTENT_SWEEP_SYSTEM_MESSAGE, CONTENT_SWEEP_PROMPT, self.sweep_llm)
+        self.section_sweep_chain = self._build_chain(CONTENT_SWEEP_SYSTEM_MESSAGE, SECTION_SWEEP_PROMPT, self.sweep_llm)
+        self.fused_chain = self._build_chain(COMPILE_AND_SWEEP_SYSTEM_MESSAGE, COMPILE_AND_SWEEP_PROMPT)
+        
         # Initialize context dictionary
         self.context = {
             "topic": "Unknown Topic",
@@ -44,6 +108,14 @@ class Editor:
             "target_date": "Unknown"
         }
 
+    def _build_chain(self, system_message: str, user_prompt: str, llm: ChatOpenAI = None):
+        """创建 system + user 模板的 LCEL 链，默认使用 self.llm。"""
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_message),
+            ("user", user_prompt)
+        ])
+        return prompt | (llm or self.llm) | StrOutputParser()
+
     async def compile_briefings(self, state: ResearchState) -> ResearchState:
         """将各维度简报编译成最终的可行性报告。"""
         topic = state.get('topic', 'Unknown Topic')
@@ -108,15 +180,28 @@ class Editor:
             logger.info("Starting report compilation")
             job_id = state.get('job_id')
             
-            # Step 1: Initial Compilation
-            edited_report = await self.compile_content(state, briefings)
-            if not edited_report:
-                logger.error("Initial compilation failed")
-                return ""
+            if TWO_PASS:
+                # Step 1: Initial Compilation; references stay out of the sweep
+                combined_content, suffix = self._prepare_compilation(state, briefings)
+                body = await self._compile_body(combined_content)
+                if not body:
+                    logger.error("Initial compilation failed")
+                    return ""
+                edited_report = body + suffix
+                # Judge only the LLM-written body; the suffix is appended verbatim
+                if needs_sweep(body):
+                    stream = self.sweep_sections(body, suffix)
+                else:
+                    logger.info("Compiled report is already clean, skipping content sweep")
+                    stream = self._emit_report(edited_report)
+            else:
+                # Compile and sweep in a single streaming pass
+                edited_report = ""
+                stream = self.compile_and_sweep(state, briefings)
 
             # Step 2 & 3: Content sweep and streaming
             final_report = ""
-            async for event in self.content_sweep(edited_report):
+            async for event in stream:
                 # Forward streaming events to job_status
                 if isinstance(event, dict) and job_id:
                     try:
@@ -149,8 +234,8 @@ class Editor:
             logger.error(f"Error in edit_report: {e}")
             return ""
     
-    async def compile_content(self, state: ResearchState, briefings: Dict[str, str]) -> str:
-        """使用 LCEL 进行初始编译。"""
+    def _prepare_compilation(self, state: ResearchState, briefings: Dict[str, str]) -> Tuple[str, str]:
+        """合并各维度简报，并生成原样附加在正文之后的后缀 (跳过检索说明 + 参考资料章节)。"""
         combined_content = "\n\n".join(content for content in briefings.values())
         
         references = state.get('references', [])
@@ -162,69 +247,178 @@ class Editor:
             reference_text = format_references_section(references, reference_info, reference_titles)
             logger.info(f"Added {len(references)} references during compilation")
         
-        # Create LCEL chain for compilation
-        compile_prompt = ChatPromptTemplate.from_messages([
-            ("system", EDITOR_SYSTEM_MESSAGE),
-            ("user", COMPILE_CONTENT_PROMPT)
-        ])
-        
-        chain = compile_prompt | self.llm | StrOutputParser()
-        
+        suffix = "".join(f"\n\n{part}" for part in (self._skipped_note(state), reference_text) if part)
+        return combined_content, suffix
+    
+    @staticmethod
+    def _skipped_note(state: ResearchState) -> str:
+        """说明哪些分析维度因事件背景已覆盖而未单独检索。"""
+        labels = [_ANALYST_LABELS.get(t, t) for t in state.get('skipped_analysts') or ()]
+        if not labels:
+            return ""
+        return f"> 注：事件背景已充分覆盖{'、'.join(labels)}，未单独检索，相关结论基于事件背景资料。"
+    
+    async def _compile_body(self, combined_content: str) -> str:
+        """编译报告正文 (不含参考资料)，失败时返回合并后的原始简报。"""
         try:
-            initial_report = await chain.ainvoke({
-                "topic": self.context["topic"],
-                "event_category": self.context["event_category"],
-                "target_date": self.context["target_date"],
-                "combined_content": combined_content
-            })
-            
-            # Append references section
-            if reference_text:
-                initial_report = f"{initial_report}\n\n{reference_text}"
-            
-            return initial_report
+            async with LLM_RATE_LIMITER:
+                return await self.compile_chain.ainvoke({
+                    "topic": self.context["topic"],
+                    "event_category": self.context["event_category"],
+                    "target_date": self.context["target_date"],
+                    "combined_content": combined_content
+                })
         except Exception as e:
             logger.error(f"Error in initial compilation: {e}")
             return combined_content or ""
         
-    async def content_sweep(self, content: str):
-        """使用 LCEL 流式输出清理内容中的冗余信息。"""
-        # Create LCEL chain for content sweep
-        sweep_prompt = ChatPromptTemplate.from_messages([
-            ("system", CONTENT_SWEEP_SYSTEM_MESSAGE),
-            ("user", CONTENT_SWEEP_PROMPT)
-        ])
+    async def compile_and_sweep(self, state: ResearchState, briefings: Dict[str, str]):
+        """使用单次 LCEL 流式调用完成编译和内容清理。"""
+        combined_content, suffix = self._prepare_compilation(state, briefings)
+        
+        inputs = {
+            "topic": self.context["topic"],
+            "event_category": self.context["event_category"],
+            "target_date": self.context["target_date"],
+            "combined_content": combined_content
+        }
+        
+        # The title and suffix are added verbatim instead of being generated by the LLM
+        prefix = f"# {self.context['topic']} 事件期货可行性报告\n\n"
+        async for event in self._stream_report(self.fused_chain, inputs, combined_content, suffix, prefix):
+            yield event
+        
+    async def content_sweep(self, content: str, suffix: str = ""):
+        """使用 LCEL 流式输出清理内容中的冗余信息，suffix 原样附加在结果之后。"""
+        inputs = {
+            "topic": self.context["topic"],
+            "event_category": self.context["event_category"],
+            "target_date": self.context["target_date"],
+            "content": content
+        }
+        
+        async for event in self._stream_report(self.sweep_chain, inputs, content, suffix):
+            yield event
+    
+    async def sweep_sections(self, content: str, suffix: str = ""):
+        """按 ## 章节并发清理报告正文，按原顺序输出各章节；suffix (跳过说明与参考资料) 不经清理原样附加。"""
+        parts = [part for part in _SECTION_SPLIT.split(content) if part.strip()]
+        if sum(part.startswith("## ") for part in parts) < 2:
+            # Nothing to fan out over, sweep the whole report
+            async for event in self.content_sweep(content, suffix):
+                yield event
+            return
+        
+        sweep_semaphore = asyncio.Semaphore(4)
         
-        chain = sweep_prompt | self.llm | StrOutputParser()
+        async def sweep_section(part: str) -> str:
+            """Sweep a single section; the title is kept verbatim."""
+            if not part.startswith("## "):
+                return part.strip()
+            async with sweep_semaphore, LLM_RATE_LIMITER:
+                try:
+                    swept = await self.section_sweep_chain.ainvoke({
+                        "topic": self.context["topic"],
+                        "event_category": self.context["event_category"],
+                        "target_date": self.context["target_date"],
+                        "content": part
+                    })
+                    return swept.strip() or part.strip()
+                except Exception as e:
+                    logger.error(f"Error sweeping section: {e}")
+                    return part.strip()
+        
+        tasks = [asyncio.create_task(sweep_section(part)) for part in parts]
+        swept_parts = []
+        try:
+            # Emit sections in report order as soon as each one is ready
+            for task in tasks:
+                swept = await task
+                swept_parts.append(swept)
+                yield {"type": "report_chunk", "chunk": f"{swept}\n\n", "step": "Editor"}
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        if suffix:
+            yield {"type": "report_chunk", "chunk": suffix.lstrip("\n"), "step": "Editor"}
+        yield "\n\n".join(swept_parts) + suffix
+    
+    async def _emit_report(self, report: str):
+        """不经 LLM 直接输出报告，事件格式与流式清理一致。"""
+        yield {"type": "report_chunk", "chunk": report, "step": "Editor"}
+        yield report.strip()
+    
+    async def _stream_report(self, chain, inputs: Dict[str, str], fallback: str, suffix: str = "", prefix: str = ""):
+        """流式运行报告链，产出 report_chunk 事件，最后产出完整报告文本 (prefix + 正文 + suffix)。"""
+        def finish(text: str) -> str:
+            text = text.strip()
+            if prefix:
+                # The prefix carries the title; drop one the model added anyway
+                text = _LEADING_TITLE.sub("", text, count=1)
+            return prefix + text + suffix
         
         try:
-            accumulated_text = ""
-            buffer = ""
+            # astream bypasses the LLM cache: serve a cached response for this exact
+            # prompt in one chunk, otherwise stream and store the result afterwards
+            cache_entry = await self._cache_entry(chain, inputs)
+            if cache_entry:
+                cache, prompt_key, llm_string = cache_entry
+                if cached := await cache.alookup(prompt_key, llm_string):
+                    report = finish(cached[0].text)
+                    yield {"type": "report_chunk", "chunk": report, "step": "Editor"}
+                    yield report
+                    return
+            
+            await LLM_RATE_LIMITER.acquire()
+            
+            if prefix:
+                yield {"type": "report_chunk", "chunk": prefix, "step": "Editor"}
+            
+            # Collect chunks in a list and join once; the pending buffer is the
+            # tail of that list starting at flushed
+            chunks = []
+            flushed = 0
+            buffer_len = 0
+            has_boundary = False
             
             # Stream using LangChain's astream
-            async for chunk in chain.astream({
-                "topic": self.context["topic"],
-                "event_category": self.context["event_category"],
-                "target_date": self.context["target_date"],
-                "content": content
-            }):
-                accumulated_text += chunk
-                buffer += chunk
+            async for chunk in chain.astream(inputs):
+                chunks.append(chunk)
+                buffer_len += len(chunk)
                 
-                # Yield chunks at sentence boundaries
-                if any(char in buffer for char in ['.', '!', '?', '\n', '。', '！', '？']) and len(buffer) > 10:
-                    yield {"type": "report_chunk", "chunk": buffer, "step": "Editor"}
-                    buffer = ""
+                # Yield chunks at sentence boundaries; the buffer only grows by
+                # chunk, so scanning the new chunk is enough
+                has_boundary = has_boundary or _SENTENCE_BOUNDARY.search(chunk) is not None
+                if has_boundary and buffer_len > 10:
+                    yield {"type": "report_chunk", "chunk": "".join(chunks[flushed:]), "step": "Editor"}
+                    flushed = len(chunks)
+                    buffer_len = 0
+                    has_boundary = False
             
             # Yield final buffer
+            buffer = "".join(chunks[flushed:]) + suffix
             if buffer:
                 yield {"type": "report_chunk", "chunk": buffer, "step": "Editor"}
             
-            yield accumulated_text.strip()
+            text = "".join(chunks)
+            if cache_entry and text.strip():
+                await cache.aupdate(prompt_key, llm_string, [ChatGeneration(message=AIMessage(content=text))])
+            
+            yield finish(text)
         except Exception as e:
             logger.error(f"Error in formatting: {e}")
             yield {"type": "error", "error": str(e), "step": "Editor"}
-            yield content or ""
+            yield finish(fallback) if fallback else ""
+
+    async def _cache_entry(self, chain, inputs: Dict[str, str]):
+        """(cache, prompt key, llm string) under which ChatOpenAI caches this call, or None."""
+        prompt_template, llm = chain.first, chain.middle[0]
+        if not isinstance(llm.cache, BaseCache):
+            return None
+        messages = (await prompt_template.ainvoke(inputs)).to_messages()
+        # Same key as BaseChatModel's own cache lookup, so ainvoke and astream share entries
+        return llm.cache, dumps(messages), llm._get_llm_string()
 
     async def run(self, state: ResearchState) -> ResearchState:
         state = await self.compile_briefings(state)
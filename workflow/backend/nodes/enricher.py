@@ -21,23 +21,47 @@ class Enricher:
             raise ValueError("TAVILY_API_KEY environment variable is not set")
         self.tavily_client = AsyncTavilyClient(api_key=tavily_key)
         self.batch_size = 20
+        # Briefing keeps at most 8000 GPT-4o tokens per document (about 4 characters
+        # each for English, fewer for Chinese), so longer pages are trimmed on ingest
+        self.max_raw_content_length = 32000
 
     async def fetch_single_content(self, url: str) -> Dict[str, str]:
         """Fetch raw content for a single URL."""
         try:
             result = await self.tavily_client.extract(url)
             if result and result.get('results'):
-                return {url: result['results'][0].get('raw_content', '')}
+                raw_content = result['results'][0].get('raw_content') or ''
+                return {url: raw_content[:self.max_raw_content_length]}
         except Exception as e:
             logger.error(f"Error fetching raw content for {url}: {e}")
             return {url: ''}
         return {url: ''}
 
+    async def fetch_batch_content(self, urls: List[str]) -> Dict[str, str]:
+        """Fetch raw content for a batch of URLs with a single extract request."""
+        try:
+            result = await self.tavily_client.extract(urls)
+        except Exception as e:
+            logger.error(f"Batch extract failed, retrying {len(urls)} URLs individually: {e}")
+            batch_contents = {}
+            for single in await asyncio.gather(*[self.fetch_single_content(url) for url in urls]):
+                batch_contents.update(single)
+            return batch_contents
+        
+        # Match results back to the requested URLs, tolerating trailing-slash differences
+        requested = {url.rstrip('/'): url for url in urls}
+        batch_contents = dict.fromkeys(urls, '')
+        for item in result.get('results', []):
+            if url := requested.get((item.get('url') or '').rstrip('/')):
+                raw_content = item.get('raw_content') or ''
+                batch_contents[url] = raw_content[:self.max_raw_content_length]
+        return batch_contents
+
     async def fetch_raw_content(self, urls: List[str]) -> Dict[str, str]:
         """Fetch raw content for multiple URLs in parallel with rate limiting."""
         raw_contents = {}
         
-        # Create batches
+        # Create batches; Tavily extract accepts up to 20 URLs per request
         batches = [urls[i:i + self.batch_size] for i in range(0, len(urls), self.batch_size)]
         
         # Process batches with rate limiting
@@ -45,13 +69,7 @@ class Enricher:
         
         async def process_batch(batch_urls: List[str]) -> Dict[str, str]:
             async with semaphore:
-                tasks = [self.fetch_single_content(url) for url in batch_urls]
-                results = await asyncio.gather(*tasks)
-                
-                batch_contents = {}
-                for result in results:
-                    batch_contents.update(result)
-                return batch_contents
+                return await self.fetch_batch_content(batch_urls)
 
         # Process all batches
         batch_results = await asyncio.gather(*[process_batch(batch) for batch in batches])
@@ -1,131 +1,227 @@
+import asyncio
 import logging
 import os
 
 from langchain_core.messages import AIMessage
-from tavily import AsyncTavilyClient
+from langchain_openai import ChatOpenAI
 
 from ..classes import InputState, ResearchState
 from ..classes.state import job_status
+from ..utils.llm_cache import get_llm_cache
+from ..utils.inflight import request_key
+from ..utils.ttl_cache import cached_search
+from .researchers import (
+    QuantifiabilityAnalyzer,
+    OracleAnalyzer,
+    MarketDemandAnalyzer,
+    ComplianceRiskAnalyzer
+)
+from .researchers.base import _get_tavily_client, plan_queries
 
 logger = logging.getLogger(__name__)
 
+# Analyzers whose seed and planned-query searches are started by the grounding node
+_ANALYZERS = (QuantifiabilityAnalyzer, OracleAnalyzer, MarketDemandAnalyzer, ComplianceRiskAnalyzer)
+
 class GroundingNode:
     """解析事件话题，收集事件背景信息。"""
     
-    def __init__(self) -> None:
-        self.tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-
-    async def initial_search(self, state: InputState):
-        """初始搜索事件背景信息并生成事件"""
-        topic = state.get('topic', 'Unknown Topic')
-        job_id = state.get('job_id')
-        msg = f"🎯 开始分析事件: {topic}...\n"
-        
-        # Emit initialization event
-        event = {
-            "type": "research_init",
-            "topic": topic,
-            "message": f"开始分析事件: {topic}",
-            "step": "初始化"
-        }
+    def __init__(self, http_client=None) -> None:
+        self.tavily_client = _get_tavily_client()
         
-        if job_id:
-            try:
-                if job_id in job_status:
-                    job_status[job_id]["events"].append(event)
-            except Exception as e:
-                logger.error(f"Error appending research_init event: {e}")
+        # Plans the queries of all four analysts in one request; without a key
+        # each analyst falls back to generating its own
+        openai_key = os.getenv("OPENAI_API_KEY")
+        self.llm = ChatOpenAI(
+            model="gpt-4o",
+            temperature=0,
+            api_key=openai_key,
+            base_url=os.getenv("OPENAI_BASE_URL", "http://4.216.184.165:3000/v1"),
+            http_async_client=http_client,
+            cache=get_llm_cache()
+        ) if openai_key else None
         
-        yield event
+        # Prefetch searches outlive the node; keep references until they finish
+        self._prefetch_tasks = set()
 
-        event_background = {}
+    def _event_stream(self, job_id):
+        """The job's event stream, looked up once per run; None when the job isn't tracked."""
+        if job_id and (job := job_status.get(job_id)) is not None:
+            return job["events"]
+        return None
 
-        # 搜索事件背景信息
-        msg += f"\n🔍 搜索事件背景: {topic}"
-        logger.info(f"Starting event background search for {topic}")
+    def _start_events(self, topic: str):
+        """初始化和背景搜索开始事件"""
+        return (
+            {
+                "type": "research_init",
+                "topic": topic,
+                "message": f"开始分析事件: {topic}",
+                "step": "初始化"
+            },
+            {
+                "type": "background_search_start",
+                "topic": topic,
+                "message": f"搜索事件背景信息: {topic}",
+                "step": "事件背景搜索"
+            }
+        )
+
+    async def _fetch_background(self, topic: str) -> dict:
+        """搜索事件背景信息，返回以URL为键的背景文档"""
+        logger.info("Initiating Tavily search for event background")
         
-        # Emit search start event
-        event = {
-            "type": "background_search_start",
-            "topic": topic,
-            "message": f"搜索事件背景信息: {topic}",
-            "step": "事件背景搜索"
-        }
+        # 搜索事件基本信息
+        search_result = await cached_search(
+            self.tavily_client,
+            f"{topic} 事件详情 背景",
+            search_depth="basic",  # Changed from advanced for speed
+            max_results=5  # Reduced from 10 for speed
+        )
         
-        if job_id:
-            try:
-                if job_id in job_status:
-                    job_status[job_id]["events"].append(event)
-            except Exception as e:
-                logger.error(f"Error appending background_search_start event: {e}")
+        event_background = {}
+        for item in search_result.get("results", []):
+            if item.get("content"):
+                url = item.get("url", "")
+                event_background[url] = {
+                    'title': item.get('title', ''),
+                    'content': item.get('content', ''),
+                    'url': url,
+                    'source': 'background_search',
+                    'score': item.get('score', 0.0)
+                }
+        return event_background
+
+    async def _fetch_seeds(self, topic: str) -> dict:
+        """Run every analyzer's baseline search concurrently; returns {analyst_type: {url: doc}}."""
+        queries = [analyzer.seed_query(topic) for analyzer in _ANALYZERS]
+        results = await asyncio.gather(
+            *(cached_search(self.tavily_client, query, **analyzer._get_search_params())
+              for analyzer, query in zip(_ANALYZERS, queries)),
+            return_exceptions=True
+        )
         
-        yield event
+        seeds = {}
+        for analyzer, query, result in zip(_ANALYZERS, queries, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Seed search failed for {analyzer.ANALYST_TYPE}: {result}")
+                continue
+            seeds[analyzer.ANALYST_TYPE] = analyzer._documents_by_url(result, query)
+        return seeds
 
+    async def _search_background(self, topic: str):
+        """Run the background search; returns (event_background, message suffix, result event)."""
+        logger.info(f"Starting event background search for {topic}")
         try:
-            logger.info("Initiating Tavily search for event background")
-            
-            # 搜索事件基本信息
-            search_result = await self.tavily_client.search(
-                query=f"{topic} 事件详情 背景",
-                search_depth="basic",  # Changed from advanced for speed
-                max_results=5  # Reduced from 10 for speed
-            )
-            
-            for item in search_result.get("results", []):
-                if item.get("content"):
-                    url = item.get("url", "")
-                    event_background[url] = {
-                        'title': item.get('title', ''),
-                        'content': item.get('content', ''),
-                        'url': url,
-                        'source': 'background_search',
-                        'score': item.get('score', 0.0)
-                    }
-            
-            if event_background:
-                logger.info(f"Successfully found {len(event_background)} background documents")
-                msg += f"\n✅ 找到 {len(event_background)} 份背景文档"
-                yield {
-                    "type": "background_search_success",
-                    "docs_found": len(event_background),
-                    "message": f"找到 {len(event_background)} 份背景文档",
-                    "step": "事件背景搜索"
-                }
-            else:
-                logger.warning("No background content found")
-                msg += "\n⚠️ 未找到背景信息"
-                yield {
-                    "type": "background_search_warning",
-                    "message": "⚠️ 未找到事件背景信息",
-                    "step": "事件背景搜索"
-                }
+            event_background = await self._fetch_background(topic)
         except Exception as e:
             error_str = str(e)
             logger.error(f"Background search error: {error_str}", exc_info=True)
             error_msg = f"⚠️ 搜索事件背景时出错: {error_str}"
-            msg += f"\n{error_msg}"
-            yield {
+            return {}, f"\n{error_msg}", {
                 "type": "background_search_error",
                 "error": error_str,
                 "message": error_msg,
                 "step": "事件背景搜索",
                 "continue_research": True
             }
+        
+        if event_background:
+            logger.info(f"Successfully found {len(event_background)} background documents")
+            return event_background, f"\n✅ 找到 {len(event_background)} 份背景文档", {
+                "type": "background_search_success",
+                "docs_found": len(event_background),
+                "message": f"找到 {len(event_background)} 份背景文档",
+                "step": "事件背景搜索"
+            }
+        
+        logger.warning("No background content found")
+        return event_background, "\n⚠️ 未找到背景信息", {
+            "type": "background_search_warning",
+            "message": "⚠️ 未找到事件背景信息",
+            "step": "事件背景搜索"
+        }
 
+    def _skipped_analysts(self, state: InputState, event_background: dict) -> list:
+        """Analyzers whose dimension the event background already covers; published to the job's events."""
+        skipped = [analyzer for analyzer in _ANALYZERS if analyzer.covered_by(event_background)]
+        if not skipped:
+            return []
+        logger.info(f"Event background covers {[a.ANALYST_TYPE for a in skipped]}, skipping their query planning and searches")
+        if (events := self._event_stream(state.get('job_id'))) is not None:
+            labels = "、".join(analyzer.LABEL for analyzer in skipped)
+            events.append({
+                "type": "analysts_skipped",
+                "analysts": [analyzer.ANALYST_TYPE for analyzer in skipped],
+                "message": f"事件背景已覆盖{labels}，跳过其单独检索",
+                "step": "事件背景搜索"
+            })
+        return [analyzer.ANALYST_TYPE for analyzer in skipped]
+
+    async def _plan_and_prefetch(self, state: InputState, analyst_types: list) -> dict:
+        """Plan queries for the analyzers still searching and prefetch them; {} when unavailable."""
+        if not self.llm or not analyst_types:
+            return {}
+        try:
+            analyst_queries = await plan_queries(self.llm, state, analyst_types)
+        except Exception as e:
+            logger.error(f"Query planning failed, analysts will generate their own queries: {e}")
+            return {}
+        self._prefetch_planned_searches(analyst_queries)
+        return analyst_queries
+
+    async def _prepare_analysts(self, state: InputState, event_background: dict, seeds_task: asyncio.Task):
+        """Decide which analyzers skip their search, then plan queries for the rest."""
+        skipped_analysts = self._skipped_analysts(state, event_background)
+        analyst_queries = await self._plan_and_prefetch(
+            state, [a.ANALYST_TYPE for a in _ANALYZERS if a.ANALYST_TYPE not in skipped_analysts]
+        )
+        # The skip decision no longer depends on the seeds, so they finish during planning
+        analyst_seeds = await seeds_task
+        return {
+            "analyst_queries": analyst_queries,
+            "analyst_seeds": analyst_seeds,
+            "skipped_analysts": skipped_analysts
+        }
+
+    def _prefetch_planned_searches(self, analyst_queries: dict) -> None:
+        """Start one search per unique planned query across all analyzers.
+
+        The analyzers' own calls for the same query join the in-flight search
+        (or hit its cached result) through ``cached_search``, so queries that
+        several analysts share reach Tavily only once.
+        """
+        unique = {}
+        for analyzer in _ANALYZERS:
+            params = analyzer._get_search_params()
+            for query in analyst_queries.get(analyzer.ANALYST_TYPE, ()):
+                unique.setdefault(request_key(query, params), (query, params))
+        
+        planned_count = sum(len(queries) for queries in analyst_queries.values())
+        logger.info(f"Prefetching {len(unique)} unique searches for {planned_count} planned queries")
+        
+        for query, params in unique.values():
+            task = asyncio.create_task(cached_search(self.tavily_client, query, **params))
+            self._prefetch_tasks.add(task)
+            task.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, task: asyncio.Task) -> None:
+        self._prefetch_tasks.discard(task)
+        # Failures resurface in the analyzer's own search; just mark them retrieved
+        if not task.cancelled() and (error := task.exception()) is not None:
+            logger.warning(f"Prefetch search failed: {error}")
+
+    def _build_research_state(self, state: InputState, msg: str, event_background: dict, analyst_fields: dict) -> ResearchState:
+        """根据输入信息和背景搜索结果初始化ResearchState"""
         # Add context about what information we have
-        context_data = {}
         if event_category := state.get('event_category'):
             msg += f"\n📂 事件类别: {event_category}"
-            context_data["event_category"] = event_category
         if target_date := state.get('target_date'):
             msg += f"\n📅 预期结算日期: {target_date}"
-            context_data["target_date"] = target_date
         if event_description := state.get('event_description'):
             msg += f"\n📝 事件描述: {event_description[:100]}..."
-            context_data["event_description"] = event_description
         
-        # Initialize ResearchState with input information
-        research_state = {
+        return {
             # Copy input fields
             "topic": state.get('topic'),
             "event_description": state.get('event_description'),
@@ -134,16 +230,56 @@ class GroundingNode:
             "job_id": state.get('job_id'),
             # Initialize research fields
             "messages": [AIMessage(content=msg)],
-            "event_background": event_background
+            "event_background": event_background,
+            # analyst_queries, analyst_seeds, skipped_analysts
+            **analyst_fields
         }
 
+    async def initial_search(self, state: InputState):
+        """初始搜索事件背景信息并生成事件"""
+        topic = state.get('topic', 'Unknown Topic')
+        events = self._event_stream(state.get('job_id'))
+        init_event, search_start_event = self._start_events(topic)
+        
+        if events is not None:
+            events.append(init_event)
+        yield init_event
+
+        # Run the analysts' seed searches while the background search runs
+        seeds_task = asyncio.create_task(self._fetch_seeds(topic))
+
+        if events is not None:
+            events.append(search_start_event)
+        yield search_start_event
+
+        # 搜索事件背景信息
+        event_background, search_msg, result_event = await self._search_background(topic)
+        yield result_event
+
+        msg = f"🎯 开始分析事件: {topic}...\n\n🔍 搜索事件背景: {topic}{search_msg}"
+        research_state = self._build_research_state(
+            state, msg, event_background, await self._prepare_analysts(state, event_background, seeds_task)
+        )
+
         yield {"type": "grounding_complete", "background_docs": len(event_background)}
         yield research_state
 
     async def run(self, state: InputState) -> ResearchState:
-        """Run grounding - note: for now returns directly, events can be captured if needed"""
-        result = None
-        async for event in self.initial_search(state):
-            if isinstance(event, dict) and "type" not in event:
-                result = event
-        return result if result else {}
+        """Run grounding without materializing the intermediate generator events"""
+        topic = state.get('topic', 'Unknown Topic')
+        events = self._event_stream(state.get('job_id'))
+        init_event, search_start_event = self._start_events(topic)
+        
+        # Progress events are still published for the job's SSE stream
+        if events is not None:
+            events.append(init_event)
+        seeds_task = asyncio.create_task(self._fetch_seeds(topic))
+        if events is not None:
+            events.append(search_start_event)
+        
+        event_background, search_msg, _ = await self._search_background(topic)
+        
+        msg = f"🎯 开始分析事件: {topic}...\n\n🔍 搜索事件背景: {topic}{search_msg}"
+        return self._build_research_state(
+            state, msg, event_background, await self._prepare_analysts(state, event_background, seeds_task)
+        )
@@ -1,38 +1,160 @@
 import asyncio
 import logging
 import os
+import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List
 
+from langchain_core.messages import AIMessage
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field
 from tavily import AsyncTavilyClient
 
 from ...classes import ResearchState
 from ...classes.state import job_status
+from ...utils.inflight import coalesce, request_key
+from ...utils.rate_limit import LLM_RATE_LIMITER
+from ...utils.ttl_cache import cached_search
 from ...utils.references import clean_title
-from ...prompts import QUERY_FORMAT_GUIDELINES
+from ...prompts import (
+    QUERY_FORMAT_GUIDELINES,
+    QUERY_PLAN_INSTRUCTION,
+    QUANTIFIABILITY_QUERY_PROMPT,
+    ORACLE_QUERY_PROMPT,
+    MARKET_DEMAND_QUERY_PROMPT,
+    COMPLIANCE_RISK_QUERY_PROMPT
+)
 
 logger = logging.getLogger(__name__)
 
+# Query prompt of every analyst, keyed by analyst_type
+ANALYST_QUERY_PROMPTS = {
+    "quantifiability_analyzer": QUANTIFIABILITY_QUERY_PROMPT,
+    "oracle_analyzer": ORACLE_QUERY_PROMPT,
+    "market_demand_analyzer": MARKET_DEMAND_QUERY_PROMPT,
+    "compliance_risk_analyzer": COMPLIANCE_RISK_QUERY_PROMPT,
+}
+
+class AnalystQueries(BaseModel):
+    """Structured output of the combined query-generation request."""
+    quantifiability_analyzer: List[str] = Field(default_factory=list, description="可量化性分析搜索查询")
+    oracle_analyzer: List[str] = Field(default_factory=list, description="预言机与结算机制搜索查询")
+    market_demand_analyzer: List[str] = Field(default_factory=list, description="市场需求分析搜索查询")
+    compliance_risk_analyzer: List[str] = Field(default_factory=list, description="合规风险分析搜索查询")
+
+_QUERY_SYSTEM_MESSAGE = ("system", "你正在研究事件'{topic}'，这是一个{event_category}类别的事件，预期结算日期为{target_date}。")
+
+# Prompt templates are static, so parse them once at import time
+_QUERY_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    _QUERY_SYSTEM_MESSAGE,
+    ("user", """研究事件 {topic}，当前时间 {year}年，日期 {date}。
+{task_prompt}
+{format_guidelines}""")
+])
+
+_QUERY_PLAN_PROMPT = ChatPromptTemplate.from_messages([
+    _QUERY_SYSTEM_MESSAGE,
+    ("user", """研究事件 {topic}，当前时间 {year}年，日期 {date}。
+{instruction}
+
+{task_prompts}
+{format_guidelines}""")
+])
+
+# (refresh deadline, year, formatted date) shared by all analysts of a run
+_DATE_TTL = 60
+_date_cache = (0.0, 0, "")
+
+def _current_date():
+    """Return (year, "YYYY年MM月DD日"), recomputed at most once a minute."""
+    global _date_cache
+    refresh_at, year, date_str = _date_cache
+    if (now_mono := time.monotonic()) >= refresh_at:
+        now = datetime.now()
+        year, date_str = now.year, f"{now.year}年{now.month:02d}月{now.day:02d}日"
+        _date_cache = (now_mono + _DATE_TTL, year, date_str)
+    return year, date_str
+
+@lru_cache(maxsize=256)
+def _format_guidelines(topic: str) -> str:
+    """Query format guidelines for a topic; shared by all analysts of the same event."""
+    return QUERY_FORMAT_GUIDELINES.format(topic=topic)
+
+@lru_cache(maxsize=1)
+def _get_tavily_client() -> AsyncTavilyClient:
+    """Tavily client shared by the grounding node and every researcher."""
+    return AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+@lru_cache(maxsize=8)
+def _get_llm(http_client=None) -> ChatOpenAI:
+    """Query-generation model shared by every researcher using the same HTTP client."""
+    return ChatOpenAI(
+        model="gpt-4o",
+        temperature=0,
+        streaming=True,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL", "http://4.216.184.165:3000/v1"),
+        http_async_client=http_client
+    )
+
+async def plan_queries(llm: ChatOpenAI, state: Dict, analyst_types: List[str] = None) -> Dict[str, List[str]]:
+    """Generate the search queries of the given analysts (default: all four) with a single LLM request."""
+    topic = state.get("topic", "Unknown Topic")
+    analyst_types = [t for t in (analyst_types or ANALYST_QUERY_PROMPTS) if t in ANALYST_QUERY_PROMPTS]
+    year, date_str = _current_date()
+    inputs = {
+        "topic": topic,
+        "event_category": state.get("event_category", "Unknown Category"),
+        "target_date": state.get("target_date", "Unknown"),
+        "year": year,
+        "date": date_str,
+        "instruction": QUERY_PLAN_INSTRUCTION,
+        "task_prompts": "\n".join(
+            f"### {analyst_type}\n{ANALYST_QUERY_PROMPTS[analyst_type].format(topic=topic)}"
+            for analyst_type in analyst_types
+        ),
+        "format_guidelines": _format_guidelines(topic)
+    }
+    chain = _QUERY_PLAN_PROMPT | llm.with_structured_output(AnalystQueries)
+    
+    async with LLM_RATE_LIMITER:
+        result = await coalesce(request_key("query_plan", inputs), lambda: chain.ainvoke(inputs))
+    
+    planned = {
+        analyst_type: [q.strip() for q in getattr(result, analyst_type, []) if q.strip()][:2]
+        for analyst_type in analyst_types
+    }
+    logger.info(f"Planned queries for {sum(1 for q in planned.values() if q)} analysts in one request")
+    return planned
+
+# An analyzer skips its own queries and searches when the event background
+# already has this many documents above SKIP_MIN_SCORE matching its keywords
+# (ANALYST_SKIP_MIN_DOCS=0 disables skipping)
+SKIP_MIN_DOCS = int(os.getenv("ANALYST_SKIP_MIN_DOCS", "3"))
+SKIP_MIN_SCORE = 0.7
+
 class BaseResearcher:
-    def __init__(self):
+    # Per-dimension parameters declared by each analyzer subclass
+    ANALYST_TYPE = "base_researcher"
+    QUERY_PROMPT = ""
+    DATA_KEY = ""
+    LABEL = ""
+    EMOJI = ""
+    # Background documents mentioning any of these count toward skipping the search
+    SKIP_KEYWORDS: tuple = ()
+
+    def __init__(self, http_client=None):
         tavily_key = os.getenv("TAVILY_API_KEY")
         openai_key = os.getenv("OPENAI_API_KEY")
-        openai_base = os.getenv("OPENAI_BASE_URL", "http://4.216.184.165:3000/v1")
         
         if not tavily_key or not openai_key:
             raise ValueError("Missing API keys")
             
-        self.tavily_client = AsyncTavilyClient(api_key=tavily_key)
-        self.llm = ChatOpenAI(
-            model="gpt-4o",
-            temperature=0,
-            streaming=True,
-            api_key=openai_key,
-            base_url=openai_base
-        )
-        self.analyst_type = "base_researcher"
+        self.tavily_client = _get_tavily_client()
+        self.llm = _get_llm(http_client)
+        self.analyst_type = self.ANALYST_TYPE
 
     @property
     def analyst_type(self) -> str:
@@ -49,32 +171,35 @@ class BaseResearcher:
         topic = state.get("topic", "Unknown Topic")
         event_category = state.get("event_category", "Unknown Category")
         target_date = state.get("target_date", "Unknown")
-        current_year = datetime.now().year
+        current_year, date_str = _current_date()
         job_id = state.get("job_id")
         
         logger.info(f"=== GENERATE_QUERIES START: analyst={self.analyst_type} ===")
         
+        # Queries planned for all analysts in one request by the grounding node
+        if planned := (state.get("analyst_queries") or {}).get(self.analyst_type):
+            logger.info(f"Using {len(planned)} planned queries for {self.analyst_type}")
+            for i, query in enumerate(planned, 1):
+                yield {"type": "query_generated", "query": query, "query_number": i, "category": self.analyst_type}
+            yield {"type": "queries_complete", "queries": planned, "count": len(planned)}
+            return
+        
         try:
-            # Create prompt template using LangChain
-            query_prompt = ChatPromptTemplate.from_messages([
-                ("system", "你正在研究事件'{topic}'，这是一个{event_category}类别的事件，预期结算日期为{target_date}。"),
-                ("user", """研究事件 {topic}，当前时间 {year}年，日期 {date}。
-{task_prompt}
-{format_guidelines}""")
-            ])
-            
             # Create LCEL chain and invoke (non-streaming for speed)
-            chain = query_prompt | self.llm
+            chain = _QUERY_PROMPT_TEMPLATE | self.llm
             
-            result = await chain.ainvoke({
+            inputs = {
                 "topic": topic,
                 "event_category": event_category,
                 "target_date": target_date,
                 "year": current_year,
-                "date": datetime.now().strftime("%Y年%m月%d日"),
+                "date": date_str,
                 "task_prompt": prompt,
-                "format_guidelines": QUERY_FORMAT_GUIDELINES.format(topic=topic)
-            })
+                "format_guidelines": _format_guidelines(topic)
+            }
+            # Identical concurrent requests share a single LLM round-trip
+            async with LLM_RATE_LIMITER:
+                result = await coalesce(request_key("queries", inputs), lambda: chain.ainvoke(inputs))
             
             # Parse queries from response
             queries = [q.strip() for q in result.content.strip().split('\n') if q.strip()]
@@ -95,7 +220,13 @@ class BaseResearcher:
             logger.error(f"Error generating queries for {topic}: {e}")
             raise RuntimeError(f"Fatal API error - query generation failed: {str(e)}") from e
 
-    def _get_search_params(self) -> Dict[str, Any]:
+    @classmethod
+    def seed_query(cls, topic: str) -> str:
+        """Baseline search for this dimension, used for grounding seeds and speculative searches."""
+        return f"{topic} {cls.LABEL}"
+
+    @classmethod
+    def _get_search_params(cls) -> Dict[str, Any]:
         """Get search parameters based on analyst type"""
         params = {
             "search_depth": "basic",
@@ -108,32 +239,59 @@ class BaseResearcher:
             "financial_analyzer": "finance"
         }
         
-        if topic := topic_map.get(self.analyst_type):
+        if topic := topic_map.get(cls.ANALYST_TYPE):
             params["topic"] = topic
             
         return params
     
-    def _process_search_result(self, result: Dict[str, Any], query: str) -> Dict[str, Any]:
+    @staticmethod
+    def _process_search_result(result: Dict[str, Any], query: str) -> Dict[str, Any]:
         """Process a single search result into standardized format"""
-        if not result.get("content") or not result.get("url"):
+        content = result.get("content")
+        url = result.get("url")
+        if not content or not url:
             return {}
             
-        url = result.get("url")
-        title = clean_title(result.get("title", "")) if result.get("title") else ""
+        title = clean_title(raw_title) if (raw_title := result.get("title")) else ""
         
-        # Reset empty or invalid titles
-        if not title or title.lower() == url.lower():
+        # Reset titles that merely repeat the URL
+        if title and title.lower() == url.lower():
             title = ""
         
         return {
             "title": title,
-            "content": result.get("content", ""),
+            "content": content,
             "query": query,
             "url": url,
             "source": "web_search",
             "score": result.get("score", 0.0)
         }
 
+    async def _collect_speculative(self, task: asyncio.Task, query: str) -> Dict[str, Any]:
+        """Documents of the speculative baseline search; empty if it failed."""
+        try:
+            result = await task
+        except Exception as e:
+            logger.warning(f"Speculative search failed for {self.analyst_type}: {e}")
+            return {}
+        return self._documents_by_url(result, query)
+
+    @classmethod
+    def _documents_by_url(cls, result: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """Standardized documents of one Tavily search response, keyed by URL."""
+        return {
+            doc["url"]: doc
+            for item in result.get("results", ())
+            if (doc := cls._process_search_result(item, query))
+        }
+
+    def _merge_with_background(self, state: ResearchState, documents: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge search results over the shared event background in a single allocation."""
+        event_background = state.get('event_background')
+        if not event_background:
+            return documents
+        return {**event_background, **documents}
+
     async def search_documents(self, state: ResearchState, queries: List[str]):
         """Execute all Tavily searches in parallel and yield events"""
         if not queries:
@@ -150,7 +308,7 @@ class BaseResearcher:
 
         # Execute all searches in parallel
         search_params = self._get_search_params()
-        search_tasks = [self.tavily_client.search(query, **search_params) for query in queries]
+        search_tasks = [cached_search(self.tavily_client, query, **search_params) for query in queries]
 
         try:
             results = await asyncio.gather(*search_tasks, return_exceptions=True)
@@ -159,17 +317,19 @@ class BaseResearcher:
             yield {"type": "error", "error": str(e)}
             return
 
-        # Process and merge results
-        merged_docs = {}
         for query, result in zip(queries, results):
             if isinstance(result, Exception):
                 logger.error(f"Search failed for query '{query}': {result}")
                 yield {"type": "query_error", "query": query, "error": str(result)}
-                continue
-                
-            for item in result.get("results", []):
-                if doc := self._process_search_result(item, query):
-                    merged_docs[doc["url"]] = doc
+
+        # Process and merge results; later queries win on duplicate URLs
+        merged_docs = {
+            doc["url"]: doc
+            for query, result in zip(queries, results)
+            if not isinstance(result, Exception)
+            for item in result.get("results", ())
+            if (doc := self._process_search_result(item, query))
+        }
 
         # Yield completion event
         yield {
@@ -179,3 +339,87 @@ class BaseResearcher:
             "queries_processed": len(queries),
             "merged_docs": merged_docs
         }
+
+    @classmethod
+    def covered_by(cls, event_background: Dict[str, Any]) -> bool:
+        """Whether the event background already holds enough relevant, high-score documents.
+
+        Decided by the grounding node, before query planning, so a covered
+        analyzer costs neither an LLM call nor its own searches. Seed documents
+        are left out: their query contains LABEL, which shares this analyzer's
+        keywords, so they would match by construction.
+        """
+        if SKIP_MIN_DOCS <= 0 or not cls.SKIP_KEYWORDS:
+            return False
+        relevant = sum(
+            1 for doc in event_background.values()
+            if doc.get('score', 0.0) > SKIP_MIN_SCORE
+            and any(kw in f"{doc.get('title', '')} {doc.get('content', '')}" for kw in cls.SKIP_KEYWORDS)
+        )
+        return relevant >= SKIP_MIN_DOCS
+
+    async def analyze(self, state: ResearchState):
+        """按子类声明的维度分析事件并生成事件"""
+        topic = state.get('topic', 'Unknown Topic')
+        
+        seeds = (state.get('analyst_seeds') or {}).get(self.analyst_type) or {}
+        
+        if self.analyst_type in (state.get('skipped_analysts') or ()):
+            # The grounding node found this dimension covered: no LLM or Tavily calls
+            logger.info(f"Event background covers {self.analyst_type}, skipping search")
+            yield {
+                "type": "search_skipped",
+                "category": self.analyst_type,
+                "message": f"事件背景已覆盖{self.LABEL}所需信息，跳过搜索"
+            }
+            queries, documents = [], {}
+        else:
+            # Without planned queries the LLM call below takes a full round-trip;
+            # hide it behind a baseline search for the topic and this dimension,
+            # unless the grounding node already ran that search as a seed
+            speculative_query = self.seed_query(topic)
+            speculative_task = None
+            if not seeds and not (state.get("analyst_queries") or {}).get(self.analyst_type):
+                speculative_task = asyncio.create_task(
+                    cached_search(self.tavily_client, speculative_query, **self._get_search_params())
+                )
+            
+            # Generate search queries and yield events
+            queries = []
+            try:
+                async for event in self.generate_queries(state, self.QUERY_PROMPT):
+                    yield event
+                    if event.get("type") == "queries_complete":
+                        queries = event.get("queries", [])
+            except BaseException:
+                if speculative_task:
+                    speculative_task.cancel()
+                raise
+            
+            # Search and merge documents, yielding events
+            documents = {}
+            async for event in self.search_documents(state, queries):
+                yield event
+                if event.get("type") == "search_complete":
+                    documents = event.get("merged_docs", {})
+            
+            if speculative_task:
+                seeds = await self._collect_speculative(speculative_task, speculative_query)
+        
+        # Seed documents are the baseline; query-driven results take precedence
+        if seeds:
+            documents = {**seeds, **documents}
+        
+        # Log subqueries (appended to messages together with the completion message)
+        subqueries_msg = f"🔍 {self.LABEL}子查询:\n" + "\n".join([f"• {query}" for query in queries])
+        
+        # Event background documents first, search results take precedence
+        data = self._merge_with_background(state, documents)
+        
+        # Update state
+        completion_msg = f"{self.EMOJI} {self.LABEL}找到 {len(data)} 份文档，事件: {topic}"
+        state.setdefault('messages', []).extend((AIMessage(content=subqueries_msg), AIMessage(content=completion_msg)))
+        state[self.DATA_KEY] = data
+        
+        yield {"type": "analysis_complete", "data_type": self.DATA_KEY, "count": len(data)}
+        yield {'message': [completion_msg], self.DATA_KEY: data}
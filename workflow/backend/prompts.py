@@ -7,9 +7,7 @@ All LLM prompts are defined here for easy maintenance and updates.
 # BRIEFING PROMPTS - 各维度简报生成
 # ============================================================================
 
-QUANTIFIABILITY_BRIEFING_PROMPT = """为事件"{topic}"创建一份可量化性评估简报。
-事件类别: {event_category}
-预期结算日期: {target_date}
+QUANTIFIABILITY_BRIEFING_PROMPT = """为给定事件创建一份可量化性评估简报。
 
 核心要求:
 1. 结构使用以下标题和要点:
@@ -39,9 +37,7 @@ QUANTIFIABILITY_BRIEFING_PROMPT = """为事件"{topic}"创建一份可量化性
 4. 只使用要点格式，不使用段落
 5. 只提供简报内容，不要解释或评论"""
 
-ORACLE_BRIEFING_PROMPT = """为事件"{topic}"创建一份预言机与结算机制评估简报。
-事件类别: {event_category}
-预期结算日期: {target_date}
+ORACLE_BRIEFING_PROMPT = """为给定事件创建一份预言机与结算机制评估简报。
 
 核心要求:
 1. 结构使用以下标题和要点:
@@ -71,9 +67,7 @@ ORACLE_BRIEFING_PROMPT = """为事件"{topic}"创建一份预言机与结算机
 4. 只使用要点格式
 5. 只提供简报内容"""
 
-MARKET_DEMAND_BRIEFING_PROMPT = """为事件"{topic}"创建一份市场需求与合约设计简报。
-事件类别: {event_category}
-预期结算日期: {target_date}
+MARKET_DEMAND_BRIEFING_PROMPT = """为给定事件创建一份市场需求与合约设计简报。
 
 核心要求:
 1. 结构使用以下标题和要点:
@@ -107,9 +101,7 @@ MARKET_DEMAND_BRIEFING_PROMPT = """为事件"{topic}"创建一份市场需求与
 3. 只使用要点格式
 5. 只提供简报内容"""
 
-COMPLIANCE_RISK_BRIEFING_PROMPT = """为事件"{topic}"创建一份合规与风险评估简报。
-事件类别: {event_category}
-预期结算日期: {target_date}
+COMPLIANCE_RISK_BRIEFING_PROMPT = """为给定事件创建一份合规与风险评估简报。
 
 核心要求:
 1. 结构使用以下标题和要点:
@@ -145,6 +137,14 @@ COMPLIANCE_RISK_BRIEFING_PROMPT = """为事件"{topic}"创建一份合规与风
 
 BRIEFING_ANALYSIS_INSTRUCTION = """分析以下文档并提取关键信息，只提供简报，不要解释或评论:"""
 
+BRIEFING_COMBINED_INSTRUCTION = """你将为同一事件一次性生成多个维度的简报。用户消息中的文档按维度分组，每个维度只使用对应分组的文档，严格遵循该维度的要求，并把简报填入同名字段。各维度要求如下:"""
+
+# 事件相关的可变部分放在各维度提示词之后，保证提示词前缀在不同事件间完全一致，
+# 从而命中 LLM 服务端的前缀缓存
+BRIEFING_EVENT_CONTEXT = """事件: "{topic}"
+事件类别: {event_category}
+预期结算日期: {target_date}"""
+
 
 # ============================================================================
 # EDITOR PROMPTS - 最终报告编译
@@ -152,12 +152,7 @@ BRIEFING_ANALYSIS_INSTRUCTION = """分析以下文档并提取关键信息，只
 
 EDITOR_SYSTEM_MESSAGE = "你是一位专业的事件期货可行性分析专家，负责将各维度研究简报编译成综合可行性报告。"
 
-COMPILE_CONTENT_PROMPT = """你正在编译关于"{topic}"的事件期货可行性报告。
-
-已编译的各维度简报:
-{combined_content}
-
-基于以上内容，创建一份深入、全面的事件期货可行性报告:
+COMPILE_CONTENT_PROMPT = """你正在编译一份事件期货可行性报告。基于文末给出的各维度简报，创建一份深入、全面的事件期货可行性报告:
 
 1. 整合所有维度的信息形成连贯的分析叙述
 2. 保留每个维度的重要细节
@@ -167,7 +162,7 @@ COMPILE_CONTENT_PROMPT = """你正在编译关于"{topic}"的事件期货可行
 
 严格执行以下文档结构:
 
-# {topic} 事件期货可行性报告
+# [事件名称] 事件期货可行性报告
 
 ## 事件概述
 [事件背景、定义、时间范围的简要描述]
@@ -201,17 +196,19 @@ COMPILE_CONTENT_PROMPT = """你正在编译关于"{topic}"的事件期货可行
 ### 优化建议
 [如何改进合约设计以提高可行性]
 
-返回 Markdown 格式的报告。不要解释或评论。"""
+返回 Markdown 格式的报告。不要解释或评论。
 
-CONTENT_SWEEP_SYSTEM_MESSAGE = "你是一位专业的 Markdown 格式化专家，确保文档结构一致。"
+事件名称: "{topic}"
 
-CONTENT_SWEEP_PROMPT = """你是一位专业的可行性报告编辑。这是一份关于"{topic}"的事件期货可行性报告。
+已编译的各维度简报:
+{combined_content}"""
 
-当前报告:
-{content}
+CONTENT_SWEEP_SYSTEM_MESSAGE = "你是一位专业的 Markdown 格式化专家，确保文档结构一致。"
+
+CONTENT_SWEEP_PROMPT = """你是一位专业的可行性报告编辑。文末给出了一份事件期货可行性报告。
 
 1. 删除冗余或重复信息
-2. 删除与"{topic}"无关的信息
+2. 删除与该事件无关的信息
 3. 删除缺乏实质内容的章节
 4. 删除任何元评论 (如"以下是报告...")
 
@@ -239,7 +236,7 @@ CONTENT_SWEEP_PROMPT = """你是一位专业的可行性报告编辑。这是一
 [保持 MLA 格式的参考文献 - 完全保留]
 
 关键规则:
-1. 文档必须以 "# {topic} 事件期货可行性报告" 开头
+1. 文档必须以 "# [事件名称] 事件期货可行性报告" 开头
 2. 文档只能使用以上 ## 标题，按此顺序
 3. 不允许使用其他 ## 标题
 4. 使用 ### 作为子标题
@@ -248,7 +245,94 @@ CONTENT_SWEEP_PROMPT = """你是一位专业的可行性报告编辑。这是一
 7. 所有要点使用 * 格式
 8. 不要修改参考资料章节的格式
 
-返回格式完美的 Markdown 报告。不要解释。"""
+返回格式完美的 Markdown 报告。不要解释。
+
+事件名称: "{topic}"
+
+当前报告:
+{content}"""
+
+SECTION_SWEEP_PROMPT = """你是一位专业的可行性报告编辑。文末给出了事件期货可行性报告中的一个章节。
+
+1. 删除冗余或重复信息
+2. 删除与该事件无关的信息
+3. 删除任何元评论 (如"以下是报告...")
+
+关键规则:
+1. 保留章节原有的 ## 标题，不要新增其他 ## 标题
+2. 使用 ### 作为子标题
+3. 不要使用代码块 (```)
+4. 段落之间不要超过一个空行
+5. 所有要点使用 * 格式
+6. 保留维度评分、可行性总评分和推荐决策
+
+只返回清理后的章节 Markdown。不要解释。
+
+事件名称: "{topic}"
+
+当前章节:
+{content}"""
+
+COMPILE_AND_SWEEP_SYSTEM_MESSAGE = "你是一位专业的事件期货可行性分析专家和 Markdown 格式化专家，负责将各维度研究简报编译成结构一致的综合可行性报告。"
+
+# 编译与清理合并为单次调用，省去第二轮完整的 LLM 输出
+COMPILE_AND_SWEEP_PROMPT = """你正在编译一份事件期货可行性报告。基于文末给出的各维度简报，一次性完成编译与格式清理，创建一份深入、全面的事件期货可行性报告:
+
+1. 整合所有维度的信息形成连贯的分析叙述
+2. 保留每个维度的重要细节
+3. 删除冗余或重复信息，以及与该事件无关的信息
+4. 删除缺乏实质内容的章节和任何元评论 (如"以下是报告...")
+5. 在最后给出综合评分和明确建议
+
+严格执行以下文档结构:
+
+## 事件概述
+[事件背景、定义、时间范围的简要描述]
+
+## 可量化性评估
+[可量化性内容，使用 ### 子标题]
+**维度评分: X/10**
+
+## 预言机与结算机制
+[预言机内容，使用 ### 子标题]
+**维度评分: X/10**
+
+## 市场需求分析
+[市场需求内容，使用 ### 子标题]
+**维度评分: X/10**
+
+## 合规与风险评估
+[合规风险内容，使用 ### 子标题]
+**维度评分: X/10**
+
+## 综合结论
+### 可行性总评分
+[基于四个维度的加权评分，给出 1-10 分]
+
+### 推荐决策
+[明确给出: 推荐上线 / 谨慎上线(需附加条件) / 不推荐上线]
+
+### 风险点汇总
+[列出主要风险点]
+
+### 优化建议
+[如何改进合约设计以提高可行性]
+
+关键规则:
+1. 文档直接从 "## 事件概述" 开始，不要输出 # 一级标题 (报告标题会自动添加)
+2. 文档只能使用以上 ## 标题，按此顺序
+3. 使用 ### 作为子标题
+4. 不要使用代码块 (```)
+5. 章节之间不要超过一个空行
+6. 所有要点使用 * 格式
+7. 不要输出参考资料章节，参考资料会自动附加在报告末尾
+
+返回格式完美的 Markdown 报告。不要解释或评论。
+
+事件名称: "{topic}"
+
+已编译的各维度简报:
+{combined_content}"""
 
 
 # ============================================================================
@@ -283,6 +367,8 @@ COMPLIANCE_RISK_QUERY_PROMPT = """针对事件"{topic}"生成合规风险分析
 - 市场操纵和内幕交易风险
 """
 
+QUERY_PLAN_INSTRUCTION = "为以下每个分析维度分别生成搜索查询，并把每个维度的查询填入同名字段:"
+
 QUERY_FORMAT_GUIDELINES = """
 重要指南:
 - 只关注与"{topic}"直接相关的信息
@@ -1,3 +1,9 @@
+from .artifacts import AsyncArtifactWriter
+from .http_client import get_shared_http_client, aclose_shared_http_client, shared_http_client_lease
+from .inflight import coalesce, request_key
+from .llm_cache import get_llm_cache
+from .rate_limit import AsyncRateLimiter, LLM_RATE_LIMITER
+from .ttl_cache import AsyncTTLCache, cached_search
 from .utils import generate_pdf_from_md, clean_text
 from .references import (
     extract_domain_name, 
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, 'wb') as f:
+        f.write(data)
+
+class AsyncArtifactWriter:
+    """Persist non-critical artifacts (e.g. per-topic reports) in the background.
+
+    Writes are queued and drained by a single task that performs the blocking
+    file I/O in a worker thread, so producers never wait on disk. Must be
+    created inside a running event loop; call ``close()`` before the loop exits.
+    """
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[Tuple[str, bytes]] = asyncio.Queue()
+        self.task = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while True:
+            path, data = await self.queue.get()
+            try:
+                await asyncio.to_thread(_write_bytes, path, data)
+            except Exception as e:
+                logger.error(f"Error writing artifact {path}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, path: str, data: bytes) -> None:
+        """Queue ``data`` to be written to ``path``."""
+        await self.queue.put((path, data))
+
+    async def flush(self) -> None:
+        """Wait until every queued artifact has been written."""
+        await self.queue.join()
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the background task."""
+        await self.flush()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
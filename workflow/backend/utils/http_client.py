@@ -0,0 +1,66 @@
+import asyncio
+import contextlib
+import importlib.util
+import logging
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# One client per event loop: pooled connections cannot be shared across loops
+_clients: Dict[int, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+# Open shared_http_client_lease blocks per event loop
+_leases: Dict[int, int] = {}
+
+def get_shared_http_client() -> Optional[httpx.AsyncClient]:
+    """Return the process-wide ``httpx.AsyncClient`` for the running event loop.
+
+    Every ``ChatOpenAI`` created on the same loop reuses its connection pool (and
+    HTTP/2 multiplexing when ``h2`` is installed) instead of opening its own.
+    Returns None outside a running loop so callers fall back to a private client.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+    # Drop clients whose loop has already been closed
+    for key in [key for key, (owner, _) in _clients.items() if owner.is_closed()]:
+        del _clients[key]
+
+    if (entry := _clients.get(id(loop))) is not None:
+        return entry[1]
+
+    client = httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        # The OpenAI SDK default read timeout; long report streams can take minutes
+        timeout=httpx.Timeout(600, connect=5)
+    )
+    _clients[id(loop)] = (loop, client)
+    logger.info("Created shared HTTP client for LLM requests")
+    return client
+
+async def aclose_shared_http_client() -> None:
+    """Close the shared client of the running event loop, if one was created."""
+    if (entry := _clients.pop(id(asyncio.get_running_loop()), None)) is not None:
+        await entry[1].aclose()
+
+@contextlib.asynccontextmanager
+async def shared_http_client_lease() -> AsyncIterator[Optional[httpx.AsyncClient]]:
+    """Hold the running loop's shared client open for the duration of the block.
+
+    The last lease to exit on a loop closes the client, so callers running on
+    an event loop they do not own still release the connection pool.
+    """
+    key = id(asyncio.get_running_loop())
+    client = get_shared_http_client()
+    _leases[key] = _leases.get(key, 0) + 1
+    try:
+        yield client
+    finally:
+        _leases[key] -= 1
+        if not _leases[key]:
+            del _leases[key]
+            await aclose_shared_http_client()
@@ -0,0 +1,42 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Pending calls keyed by (event loop, request key); futures are bound to their loop
+_inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+
+def request_key(*parts: Any) -> str:
+    """Stable hash of JSON-serializable call arguments, for use with ``coalesce``."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+async def coalesce(key: str, factory: Callable[[], Awaitable[T]]) -> T:
+    """Await ``factory()``, sharing its outcome with concurrent callers using the same key.
+
+    Only calls that overlap in time are merged; once the first call finishes the
+    key is released, so later calls hit the API (or a response cache) again.
+    """
+    loop = asyncio.get_running_loop()
+    slot = (id(loop), key)
+    if (pending := _inflight.get(slot)) is not None:
+        return await asyncio.shield(pending)
+
+    future = loop.create_future()
+    _inflight[slot] = future
+    try:
+        result = await factory()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # the caller re-raises; don't log it as unretrieved
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(slot, None)
@@ -0,0 +1,32 @@
+import logging
+import os
+from typing import Optional
+
+from langchain_core.caches import BaseCache
+
+logger = logging.getLogger(__name__)
+
+_llm_cache: Optional[BaseCache] = None
+_llm_cache_initialized = False
+
+def get_llm_cache() -> Optional[BaseCache]:
+    """Return the process-wide LLM response cache, or None when caching is disabled.
+
+    Backed by SQLite at ``LLM_CACHE_PATH`` (default ``.llm_cache.db``) so identical
+    prompts are reused across runs; set ``LLM_CACHE_PATH=""`` to disable.
+    """
+    global _llm_cache, _llm_cache_initialized
+    if _llm_cache_initialized:
+        return _llm_cache
+
+    _llm_cache_initialized = True
+    cache_path = os.getenv("LLM_CACHE_PATH", ".llm_cache.db")
+    if not cache_path:
+        logger.info("LLM response cache disabled")
+        return None
+
+    from langchain_community.cache import SQLiteCache
+
+    _llm_cache = SQLiteCache(database_path=cache_path)
+    logger.info(f"LLM response cache enabled at {cache_path}")
+    return _llm_cache
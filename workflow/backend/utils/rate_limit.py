@@ -0,0 +1,55 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+class AsyncRateLimiter:
+    """Token-bucket limiter allowing ``max_rate`` acquisitions per ``time_period`` seconds.
+
+    Unlike running calls sequentially, the bucket lets bursts through while
+    capacity is available and only waits once the steady-state rate is hit.
+    Usable as ``await limiter.acquire()`` or ``async with limiter:``.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60) -> None:
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._rate_per_sec = max_rate / time_period
+        self._tokens = float(max_rate)
+        self._last_refill = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Return a lock for the running loop; an asyncio.Lock cannot be shared across loops."""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.max_rate, self._tokens + elapsed * self._rate_per_sec)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        async with self._get_lock():
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._rate_per_sec)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+# Process-wide limiter for LLM requests from the analyzers, Briefing and Editor.
+# The bucket is shared across event loops, so sequential go_sync calls share the budget.
+LLM_RATE_LIMITER = AsyncRateLimiter(max_rate=int(os.getenv("LLM_RPM", "120")), time_period=60)
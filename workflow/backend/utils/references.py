@@ -1,10 +1,14 @@
 import logging
 import re
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# Leading "YYYY-MM-DD" style date prefix stripped from titles
+_LEADING_DATE = re.compile(r'^\d{4}[-\s]*\d{1,2}[-\s]*\d{1,2}[-\s]*')
+
 def extract_domain_name(url: str) -> str:
     """Extract a readable website name from a URL."""
     try:
@@ -66,6 +70,7 @@ def extract_title_from_url_path(url: str) -> str:
         logger.error(f"Error extracting title from URL path: {e}")
         return ""
 
+@lru_cache(maxsize=1024)
 def clean_title(title: str) -> str:
     """Clean up a title by removing dates, trailing periods or quotes, and truncating if needed."""
     if not title:
@@ -74,7 +79,7 @@ def clean_title(title: str) -> str:
     original_title = title
     
     title = title.strip().rstrip('.').strip('"\'')
-    title = re.sub(r'^\d{4}[-\s]*\d{1,2}[-\s]*\d{1,2}[-\s]*', '', title)
+    title = _LEADING_DATE.sub('', title)
     title = title.strip('- ').strip()
     
     # If title became empty after cleaning, return empty string
@@ -347,7 +352,7 @@ def format_references_section(references: List[str], reference_info: Dict[str, D
     logger.info("Maintaining reference order based on scores")
     
     # Format references in MLA style
-    reference_lines = ["\n## References"]
+    reference_lines = ["## 参考资料"]
     for entry in reference_entries:
         reference_line = format_reference_for_markdown(entry)
         reference_lines.append(reference_line)
@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from .inflight import coalesce, request_key
+
+class AsyncTTLCache:
+    """Bounded LRU cache whose entries expire ``ttl`` seconds after being stored.
+
+    ``get_or_fetch`` also coalesces concurrent misses for the same key, so a
+    burst of identical requests results in a single upstream call.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, awaiting ``factory()`` on a miss."""
+        if (value := self.get(key)) is not None:
+            return value
+        value = await coalesce(key, factory)
+        self.set(key, value)
+        return value
+
+
+# Tavily search results shared by the grounding node and all analyzers
+TAVILY_SEARCH_CACHE = AsyncTTLCache(maxsize=1024, ttl=3600)
+
+async def cached_search(client: Any, query: str, **params: Any) -> dict:
+    """``client.search`` through the process-wide Tavily cache, keyed by query and parameters."""
+    return await TAVILY_SEARCH_CACHE.get_or_fetch(
+        request_key("tavily", query, params),
+        lambda: client.search(query, **params)
+    )